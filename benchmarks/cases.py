@@ -0,0 +1,224 @@
+import datetime
+import random
+from typing import Callable
+
+from django.db import transaction
+from django.db.models import F
+
+from db.models import Actor, CinemaHall, Genre, MovieSession, User
+from services.movie import FILTER_MODES, get_movies
+from services.movie_session import (
+    find_adjacent_free_seats,
+    get_movies_sessions,
+    get_schedule,
+    get_taken_seats,
+    recommend_seats,
+)
+from services.order import create_order, get_orders
+from services.sales_analytics import (
+    get_hall_utilization,
+    get_sales_time_series,
+    get_top_movies,
+)
+from services.scheduler import schedule_sessions
+from services.seat_map import seat_map_cache
+
+
+BENCHMARKS = {}
+FILTER_ID_COUNTS = (1, 4, 16, 64)
+SCHEDULE_TIMES = ("10:00", "12:30", "15:00", "17:30", "20:00", "22:30")
+
+
+def benchmark(name: str) -> Callable:
+    def register(case: Callable) -> Callable:
+        BENCHMARKS[name] = case
+        return case
+
+    return register
+
+
+def load_context(rng: random.Random, sample_size: int = 200) -> dict:
+    def sample(values: list) -> list:
+        return rng.sample(values, min(sample_size, len(values)))
+
+    session_ids = list(MovieSession.objects.values_list("id", flat=True))
+    return {
+        "rng": rng,
+        "session_ids": sample(session_ids),
+        "usernames": sample(
+            list(User.objects.values_list("username", flat=True))
+        ),
+        "genre_ids": list(Genre.objects.values_list("id", flat=True)),
+        "actor_ids": sample(list(Actor.objects.values_list("id", flat=True))),
+        "large_session_ids": list(
+            MovieSession.objects.annotate(
+                capacity=(
+                    F("cinema_hall__rows") * F("cinema_hall__seats_in_row")
+                )
+            ).order_by("-capacity", "id").values_list(
+                "id", flat=True
+            )[:sample_size]
+        ),
+        "hall_ids": sample(
+            list(CinemaHall.objects.values_list("id", flat=True))
+        ),
+        "dates": sorted({
+            show_time.date()
+            for show_time in MovieSession.objects.filter(
+                id__in=sample(session_ids)
+            ).values_list("show_time", flat=True)
+        }),
+    }
+
+
+@benchmark("create_order")
+def bench_create_order(context: dict) -> None:
+    rng = context["rng"]
+    movie_session_id = rng.choice(context["session_ids"])
+    seats = find_adjacent_free_seats(movie_session_id, 4)
+    if not seats:
+        return
+    with transaction.atomic():
+        create_order(
+            tickets=[
+                {**seat, "movie_session": movie_session_id} for seat in seats
+            ],
+            username=rng.choice(context["usernames"]),
+        )
+        transaction.set_rollback(True)
+
+
+@benchmark("get_taken_seats_cold")
+def bench_get_taken_seats_cold(context: dict) -> None:
+    seat_map_cache.clear()
+    get_taken_seats(context["rng"].choice(context["session_ids"]))
+
+
+@benchmark("get_taken_seats_warm")
+def bench_get_taken_seats_warm(context: dict) -> None:
+    get_taken_seats(context["session_ids"][0])
+
+
+@benchmark("recommend_seats_cold")
+def bench_recommend_seats_cold(context: dict) -> None:
+    seat_map_cache.clear()
+    recommend_seats(context["rng"].choice(context["large_session_ids"]), 4)
+
+
+@benchmark("recommend_seats_warm")
+def bench_recommend_seats_warm(context: dict) -> None:
+    recommend_seats(
+        context["large_session_ids"][0], context["rng"].randint(1, 8)
+    )
+
+
+@benchmark("get_movies_filtered")
+def bench_get_movies_filtered(context: dict) -> None:
+    rng = context["rng"]
+    list(get_movies(
+        genres_ids=rng.sample(context["genre_ids"], 2),
+        actors_ids=rng.sample(context["actor_ids"], 3),
+    ))
+
+
+def make_filter_ids_case(filter_ids_count: int, mode: str) -> Callable:
+    def bench_get_movies_filter_ids(context: dict) -> None:
+        actor_ids = context["actor_ids"]
+        list(get_movies(
+            actors_ids=context["rng"].sample(
+                actor_ids, min(filter_ids_count, len(actor_ids))
+            ),
+            actors_mode=mode,
+        ).values_list("id", flat=True))
+
+    return bench_get_movies_filter_ids
+
+
+for filter_mode in FILTER_MODES:
+    for ids_count in FILTER_ID_COUNTS:
+        benchmark(f"get_movies_{filter_mode}_{ids_count}_actors")(
+            make_filter_ids_case(ids_count, filter_mode)
+        )
+
+
+@benchmark("get_movies_title")
+def bench_get_movies_title(context: dict) -> None:
+    list(get_movies(title=context["rng"].choice(["Inception", "Looper"])))
+
+
+@benchmark("get_orders_username")
+def bench_get_orders_username(context: dict) -> None:
+    list(get_orders(username=context["rng"].choice(context["usernames"])))
+
+
+@benchmark("get_movies_sessions_date")
+def bench_get_movies_sessions_date(context: dict) -> None:
+    session_date = context["rng"].choice(context["dates"])
+    list(get_movies_sessions(session_date=str(session_date)))
+
+
+@benchmark("get_schedule_day")
+def bench_get_schedule_day(context: dict) -> None:
+    get_schedule(context["rng"].choice(context["dates"]))
+
+
+@benchmark("get_schedule_week")
+def bench_get_schedule_week(context: dict) -> None:
+    start_date = context["rng"].choice(context["dates"])
+    get_schedule(start_date, start_date + datetime.timedelta(days=6))
+
+
+@benchmark("get_schedule_week_halls")
+def bench_get_schedule_week_halls(context: dict) -> None:
+    rng = context["rng"]
+    start_date = rng.choice(context["dates"])
+    hall_ids = context["hall_ids"]
+    get_schedule(
+        start_date,
+        start_date + datetime.timedelta(days=6),
+        cinema_hall_ids=rng.sample(hall_ids, min(5, len(hall_ids))),
+    )
+
+
+@benchmark("top_movies_month")
+def bench_top_movies_month(context: dict) -> None:
+    start_date = context["rng"].choice(context["dates"])
+    get_top_movies(start_date, start_date + datetime.timedelta(days=29))
+
+
+@benchmark("hall_utilization_week")
+def bench_hall_utilization_week(context: dict) -> None:
+    start_date = context["rng"].choice(context["dates"])
+    get_hall_utilization(start_date, start_date + datetime.timedelta(days=6))
+
+
+@benchmark("sales_time_series_month")
+def bench_sales_time_series_month(context: dict) -> None:
+    rng = context["rng"]
+    start_date = rng.choice(context["dates"])
+    get_sales_time_series(
+        start_date,
+        start_date + datetime.timedelta(days=29),
+        cinema_hall_ids=rng.sample(
+            context["hall_ids"], min(5, len(context["hall_ids"]))
+        ),
+    )
+
+
+@benchmark("schedule_sessions_week")
+def bench_schedule_sessions_week(context: dict) -> None:
+    rng = context["rng"]
+    start_date = datetime.date(2030, 1, 7) + datetime.timedelta(
+        weeks=rng.randint(0, 1000)
+    )
+    with transaction.atomic():
+        schedule_sessions([
+            {
+                "movie": 1,
+                "cinema_halls": context["hall_ids"],
+                "times": SCHEDULE_TIMES,
+                "start_date": start_date,
+                "end_date": start_date + datetime.timedelta(days=6),
+            }
+        ])
+        transaction.set_rollback(True)
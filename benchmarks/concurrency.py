@@ -0,0 +1,194 @@
+import argparse
+import asyncio
+import json
+import random
+import sys
+import time
+from typing import Callable
+
+from benchmarks.run import prepare_database
+from benchmarks.cases import load_context
+from benchmarks.seed import DEFAULT_SCALE
+from db.models import Order
+from services.async_api import (
+    SERVICE_THREAD_POOL_SIZE,
+    acreate_order,
+    aget_movies,
+    aget_schedule,
+    aget_taken_seats,
+    arecommend_seats,
+    shutdown_executors,
+    write_pool_size,
+)
+from services.movie import get_movies
+from services.movie_session import (
+    get_schedule,
+    get_taken_seats,
+    recommend_seats,
+)
+from services.order import create_order
+
+
+DEFAULT_REQUESTS = 500
+DEFAULT_CONCURRENCY = 32
+
+
+def order_arguments(context: dict) -> dict:
+    rng = context["rng"]
+    return {
+        "tickets": [{
+            "row": 1,
+            "seat": 1,
+            "movie_session": rng.choice(context["session_ids"]),
+        }],
+        "username": rng.choice(context["usernames"]),
+        "replace_taken": True,
+    }
+
+
+WORKLOADS = {
+    "get_taken_seats": (
+        lambda context: ((context["rng"].choice(context["session_ids"]),), {}),
+        get_taken_seats,
+        aget_taken_seats,
+    ),
+    "get_movies": (
+        lambda context: ((), {
+            "actors_ids": context["rng"].sample(context["actor_ids"], 3),
+        }),
+        lambda *args, **kwargs: list(get_movies(*args, **kwargs)),
+        aget_movies,
+    ),
+    "get_schedule": (
+        lambda context: ((context["rng"].choice(context["dates"]),), {}),
+        get_schedule,
+        aget_schedule,
+    ),
+    "recommend_seats": (
+        lambda context: ((
+            context["rng"].choice(context["large_session_ids"]),
+            context["rng"].randint(1, 8),
+        ), {}),
+        recommend_seats,
+        arecommend_seats,
+    ),
+    "create_order": (
+        lambda context: ((), order_arguments(context)),
+        create_order,
+        acreate_order,
+    ),
+}
+
+
+def collect_order(result: object, created_orders: list[int]) -> None:
+    if isinstance(result, Order):
+        created_orders.append(result.id)
+
+
+def run_sync(
+        arguments: Callable,
+        call: Callable,
+        context: dict,
+        requests: int,
+        created_orders: list[int]
+) -> float:
+    calls = [arguments(context) for _ in range(requests)]
+    started = time.perf_counter()
+    for args, kwargs in calls:
+        collect_order(call(*args, **kwargs), created_orders)
+    return requests / (time.perf_counter() - started)
+
+
+async def run_async(
+        arguments: Callable,
+        call: Callable,
+        context: dict,
+        requests: int,
+        concurrency: int,
+        created_orders: list[int]
+) -> float:
+    calls = [arguments(context) for _ in range(requests)]
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def limited(args: tuple, kwargs: dict) -> None:
+        async with semaphore:
+            collect_order(await call(*args, **kwargs), created_orders)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(limited(args, kwargs) for args, kwargs in calls))
+    return requests / (time.perf_counter() - started)
+
+
+def run_concurrency_benchmarks(
+        names: list[str] = None,
+        requests: int = DEFAULT_REQUESTS,
+        concurrency: int = DEFAULT_CONCURRENCY,
+        seed: int = 0
+) -> dict:
+    context = load_context(random.Random(seed))
+    created_orders = []
+    results = {}
+    try:
+        for name in names or WORKLOADS:
+            arguments, sync_call, async_call = WORKLOADS[name]
+            sync_rps = run_sync(
+                arguments, sync_call, context, requests, created_orders
+            )
+            async_rps = asyncio.run(run_async(
+                arguments, async_call, context, requests, concurrency,
+                created_orders,
+            ))
+            results[name] = {
+                "requests": requests,
+                "sync_rps": sync_rps,
+                "async_rps": async_rps,
+                "speedup": async_rps / sync_rps,
+            }
+    finally:
+        shutdown_executors()
+        Order.objects.filter(id__in=created_orders).delete()
+    return results
+
+
+def parse_args(argv: list[str]) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        description="Compare sync and async service throughput."
+    )
+    for key, default in DEFAULT_SCALE.items():
+        parser.add_argument(f"--{key}", type=int, default=default)
+    parser.add_argument("--requests", type=int, default=DEFAULT_REQUESTS)
+    parser.add_argument("--concurrency", type=int,
+                        default=DEFAULT_CONCURRENCY)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--only", nargs="*", choices=sorted(WORKLOADS))
+    parser.add_argument("--output", default="benchmark_results_async.json")
+    return parser.parse_args(argv)
+
+
+def main(argv: list[str] = None) -> int:
+    args = parse_args(sys.argv[1:] if argv is None else argv)
+    scale = {key: getattr(args, key) for key in DEFAULT_SCALE}
+    report = {
+        "meta": {
+            "scale": scale,
+            "dataset": prepare_database(scale, args.seed),
+            "thread_pool_size": SERVICE_THREAD_POOL_SIZE,
+            "write_pool_size": write_pool_size(),
+            "concurrency": args.concurrency,
+        },
+        "results": run_concurrency_benchmarks(
+            args.only, args.requests, args.concurrency, args.seed
+        ),
+    }
+    with open(args.output, "w") as output:
+        json.dump(report, output, indent=2)
+
+    for name, result in report["results"].items():
+        print(f"{name:20} sync {result['sync_rps']:9.1f} req/s  "
+              f"async {result['async_rps']:9.1f} req/s  "
+              f"(x{result['speedup']:.2f})")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,167 @@
+import argparse
+import json
+import os
+import platform
+import random
+import statistics
+import sys
+import time
+from typing import Iterable
+
+os.environ.setdefault("PASSWORD_HASHER_PROFILE", "fast")
+os.environ.setdefault(
+    "DATABASE_NAME",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                 "benchmark.sqlite3"),
+)
+
+import init_django_orm  # noqa: E402, F401
+import django  # noqa: E402
+from django.conf import settings  # noqa: E402
+from django.core.management import call_command  # noqa: E402
+from django.db import connection  # noqa: E402
+from django.test.utils import CaptureQueriesContext  # noqa: E402
+
+from benchmarks.cases import BENCHMARKS, load_context  # noqa: E402
+from benchmarks.seed import DEFAULT_SCALE, seed_dataset  # noqa: E402
+from db.models import CinemaHall  # noqa: E402
+
+
+DEFAULT_REPEATS = 30
+DEFAULT_THRESHOLD = 0.2
+
+
+def dataset_path() -> str:
+    return f"{settings.DATABASES['default']['NAME']}.json"
+
+
+def seeded_dataset() -> dict | None:
+    try:
+        with open(dataset_path()) as dataset:
+            return json.load(dataset)
+    except (FileNotFoundError, ValueError):
+        return None
+
+
+def prepare_database(scale: dict, seed: int = 0) -> dict:
+    call_command("migrate", verbosity=0)
+    dataset = {"scale": {**DEFAULT_SCALE, **scale}, "seed": seed}
+    if CinemaHall.objects.exists():
+        if seeded_dataset() == dataset:
+            return {"seeded": False}
+        call_command("flush", interactive=False, verbosity=0)
+    started = time.perf_counter()
+    counts = seed_dataset(dataset["scale"], seed=seed)
+    with open(dataset_path(), "w") as output:
+        json.dump(dataset, output)
+    return {
+        "seeded": True,
+        "seconds": time.perf_counter() - started,
+        **counts,
+    }
+
+
+def time_case(name: str, context: dict, repeats: int) -> dict:
+    case = BENCHMARKS[name]
+    with CaptureQueriesContext(connection) as queries:
+        case(context)
+    timings = []
+    for _ in range(repeats):
+        started = time.perf_counter()
+        case(context)
+        timings.append((time.perf_counter() - started) * 1000)
+    timings.sort()
+    return {
+        "repeats": repeats,
+        "queries": len(queries),
+        "min_ms": timings[0],
+        "median_ms": statistics.median(timings),
+        "p95_ms": timings[min(len(timings) - 1, int(len(timings) * 0.95))],
+        "max_ms": timings[-1],
+    }
+
+
+def run_benchmarks(
+        names: Iterable[str] = None,
+        repeats: int = DEFAULT_REPEATS,
+        seed: int = 0
+) -> dict:
+    context = load_context(random.Random(seed))
+    return {
+        name: time_case(name, context, repeats)
+        for name in (names or BENCHMARKS)
+    }
+
+
+def compare_results(
+        current: dict,
+        baseline: dict,
+        threshold: float = DEFAULT_THRESHOLD
+) -> list[dict]:
+    regressions = []
+    for name, timing in current["results"].items():
+        previous = baseline["results"].get(name)
+        if not previous or not previous["median_ms"]:
+            continue
+        ratio = timing["median_ms"] / previous["median_ms"]
+        if ratio > 1 + threshold:
+            regressions.append({
+                "benchmark": name,
+                "baseline_ms": previous["median_ms"],
+                "current_ms": timing["median_ms"],
+                "ratio": ratio,
+            })
+    return regressions
+
+
+def parse_args(argv: list[str]) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        description="Seed a synthetic cinema dataset and time services."
+    )
+    for key, default in DEFAULT_SCALE.items():
+        parser.add_argument(f"--{key}", type=int, default=default)
+    parser.add_argument("--repeats", type=int, default=DEFAULT_REPEATS)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--only", nargs="*", choices=sorted(BENCHMARKS))
+    parser.add_argument("--output", default="benchmark_results.json")
+    parser.add_argument("--baseline")
+    parser.add_argument("--threshold", type=float,
+                        default=DEFAULT_THRESHOLD)
+    return parser.parse_args(argv)
+
+
+def main(argv: list[str] = None) -> int:
+    args = parse_args(sys.argv[1:] if argv is None else argv)
+    scale = {key: getattr(args, key) for key in DEFAULT_SCALE}
+    report = {
+        "meta": {
+            "python": platform.python_version(),
+            "django": django.get_version(),
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "scale": scale,
+            "dataset": prepare_database(scale, args.seed),
+        },
+        "results": run_benchmarks(args.only, args.repeats, args.seed),
+    }
+    with open(args.output, "w") as output:
+        json.dump(report, output, indent=2)
+
+    for name, timing in report["results"].items():
+        print(f"{name:32} median {timing['median_ms']:9.3f} ms  "
+              f"p95 {timing['p95_ms']:9.3f} ms")
+
+    if not args.baseline:
+        return 0
+    with open(args.baseline) as baseline_file:
+        baseline = json.load(baseline_file)
+    regressions = compare_results(report, baseline, args.threshold)
+    for regression in regressions:
+        print(f"REGRESSION {regression['benchmark']}: "
+              f"{regression['baseline_ms']:.3f} ms -> "
+              f"{regression['current_ms']:.3f} ms "
+              f"(x{regression['ratio']:.2f})")
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
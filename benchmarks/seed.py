@@ -0,0 +1,215 @@
+import datetime
+import json
+import os
+import random
+from itertools import islice
+from typing import Iterable, Iterator
+
+from django.conf import settings
+from django.contrib.auth.hashers import make_password
+from django.db import transaction
+
+from db.models import (
+    Actor,
+    CinemaHall,
+    Genre,
+    Movie,
+    MovieSession,
+    Order,
+    Ticket,
+    User,
+)
+from services.occupancy import reconcile_occupancy
+from services.sales_rollup import rebuild_sales_rollup
+
+
+FIXTURE_PATH = os.path.join(settings.BASE_DIR, "cinema_db_data.json")
+
+DEFAULT_SCALE = {
+    "halls": 2000,
+    "movies": 5000,
+    "actors": 3000,
+    "users": 20000,
+    "sessions": 100000,
+    "tickets": 2000000,
+}
+
+SCHEDULE_START = datetime.datetime(2024, 1, 1, 9, 0)
+SCHEDULE_DAYS = 90
+BENCHMARK_PASSWORD = "benchmark"
+
+
+def load_fixture_shapes(path: str = FIXTURE_PATH) -> dict:
+    with open(path) as fixture:
+        records = json.load(fixture)
+    return {
+        "halls": [
+            (record["fields"]["rows"], record["fields"]["seats_in_row"])
+            for record in records
+            if record["model"] == "db.cinemahall"
+        ],
+        "genres": [
+            record["fields"]["name"]
+            for record in records
+            if record["model"] == "db.genre"
+        ],
+        "titles": [
+            record["fields"]["title"]
+            for record in records
+            if record["model"] == "db.movie"
+        ],
+    }
+
+
+def insert_in_batches(
+        model: type,
+        objects: Iterable,
+        batch_size: int
+) -> int:
+    objects = iter(objects)
+    inserted = 0
+    while True:
+        batch = list(islice(objects, batch_size))
+        if not batch:
+            return inserted
+        model.objects.bulk_create(batch)
+        inserted += len(batch)
+
+
+def generate_bookings(
+        rng: random.Random,
+        hall_sizes: dict[int, tuple[int, int]],
+        session_halls: list[int],
+        tickets: int,
+        users: int
+) -> Iterator[tuple[list[Order], list[Ticket]]]:
+    tickets_per_session = max(1, tickets // len(session_halls))
+    ticket_id = 0
+    order_id = 0
+    for session_id, hall_id in enumerate(session_halls, start=1):
+        rows, seats_in_row = hall_sizes[hall_id]
+        count = min(
+            rows * seats_in_row, tickets_per_session, tickets - ticket_id
+        )
+        if count <= 0:
+            return
+        session_orders = []
+        session_tickets = []
+        positions = rng.sample(range(rows * seats_in_row), count)
+        for index, position in enumerate(positions):
+            if index % 4 == 0:
+                order_id += 1
+                session_orders.append(Order(
+                    id=order_id,
+                    user_id=rng.randint(1, users),
+                    created_at=SCHEDULE_START - datetime.timedelta(
+                        minutes=rng.randint(0, 3 * 365 * 24 * 60)
+                    ),
+                ))
+            ticket_id += 1
+            row, seat = divmod(position, seats_in_row)
+            session_tickets.append(Ticket(
+                id=ticket_id,
+                movie_session_id=session_id,
+                order_id=order_id,
+                row=row + 1,
+                seat=seat + 1,
+            ))
+        yield session_orders, session_tickets
+
+
+@transaction.atomic
+def seed_dataset(
+        scale: dict = None,
+        batch_size: int = 5000,
+        seed: int = 0
+) -> dict:
+    scale = {**DEFAULT_SCALE, **(scale or {})}
+    rng = random.Random(seed)
+    shapes = load_fixture_shapes()
+
+    hall_sizes = {
+        hall_id: rng.choice(shapes["halls"])
+        for hall_id in range(1, scale["halls"] + 1)
+    }
+    insert_in_batches(CinemaHall, (
+        CinemaHall(
+            id=hall_id, name=f"Hall {hall_id}", rows=rows,
+            seats_in_row=seats_in_row
+        )
+        for hall_id, (rows, seats_in_row) in hall_sizes.items()
+    ), batch_size)
+    insert_in_batches(Genre, (
+        Genre(id=genre_id, name=name)
+        for genre_id, name in enumerate(shapes["genres"], start=1)
+    ), batch_size)
+    insert_in_batches(Actor, (
+        Actor(id=actor_id, first_name=f"Actor{actor_id}",
+              last_name=f"Performer{actor_id % 97}")
+        for actor_id in range(1, scale["actors"] + 1)
+    ), batch_size)
+    insert_in_batches(Movie, (
+        Movie(
+            id=movie_id,
+            title=f"{rng.choice(shapes['titles'])} {movie_id}",
+            description=f"Synthetic movie {movie_id}",
+        )
+        for movie_id in range(1, scale["movies"] + 1)
+    ), batch_size)
+    insert_in_batches(Movie.genres.through, (
+        Movie.genres.through(movie_id=movie_id, genre_id=genre_id)
+        for movie_id in range(1, scale["movies"] + 1)
+        for genre_id in rng.sample(
+            range(1, len(shapes["genres"]) + 1), rng.randint(1, 3)
+        )
+    ), batch_size)
+    insert_in_batches(Movie.actors.through, (
+        Movie.actors.through(movie_id=movie_id, actor_id=actor_id)
+        for movie_id in range(1, scale["movies"] + 1)
+        for actor_id in rng.sample(
+            range(1, scale["actors"] + 1), min(scale["actors"], 4)
+        )
+    ), batch_size)
+
+    password = make_password(BENCHMARK_PASSWORD)
+    insert_in_batches(User, (
+        User(id=user_id, username=f"user_{user_id}", password=password)
+        for user_id in range(1, scale["users"] + 1)
+    ), batch_size)
+
+    session_halls = [
+        rng.randint(1, scale["halls"]) for _ in range(scale["sessions"])
+    ]
+    insert_in_batches(MovieSession, (
+        MovieSession(
+            id=session_id,
+            movie_id=rng.randint(1, scale["movies"]),
+            cinema_hall_id=hall_id,
+            show_time=SCHEDULE_START + datetime.timedelta(
+                minutes=10 * rng.randint(0, SCHEDULE_DAYS * 24 * 6)
+            ),
+        )
+        for session_id, hall_id in enumerate(session_halls, start=1)
+    ), batch_size)
+
+    orders = []
+    tickets = []
+    counts = {"orders": 0, "tickets": 0}
+    bookings = generate_bookings(
+        rng, hall_sizes, session_halls, scale["tickets"], scale["users"]
+    )
+    for session_orders, session_tickets in bookings:
+        orders.extend(session_orders)
+        tickets.extend(session_tickets)
+        if len(tickets) >= batch_size:
+            counts["orders"] += insert_in_batches(Order, orders, batch_size)
+            counts["tickets"] += insert_in_batches(
+                Ticket, tickets, batch_size
+            )
+            orders.clear()
+            tickets.clear()
+    counts["orders"] += insert_in_batches(Order, orders, batch_size)
+    counts["tickets"] += insert_in_batches(Ticket, tickets, batch_size)
+    reconcile_occupancy(batch_size=batch_size)
+    rebuild_sales_rollup(batch_size=batch_size)
+    return {**scale, **counts}
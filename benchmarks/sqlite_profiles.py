@@ -0,0 +1,203 @@
+import argparse
+import json
+import multiprocessing
+import os
+import random
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+
+from benchmarks.run import prepare_database
+from benchmarks.cases import load_context
+from benchmarks.concurrency import order_arguments
+from benchmarks.seed import DEFAULT_SCALE
+from django.conf import settings
+from django.db import OperationalError, connection
+from services.booking import SeatConflictError
+from services.movie_session import get_schedule
+from services.order import create_order, get_order_history
+
+
+DEFAULT_PROCESSES = 4
+DEFAULT_DURATION = 5.0
+DEFAULT_WRITE_RATIO = 0.2
+
+
+def read_request(context: dict) -> None:
+    rng = context["rng"]
+    if rng.random() < 0.5:
+        get_schedule(rng.choice(context["dates"]))
+    else:
+        get_order_history(rng.choice(context["usernames"]))
+
+
+def write_request(context: dict) -> None:
+    create_order(**order_arguments(context))
+
+
+def run_worker(
+        index: int,
+        duration: float,
+        write_ratio: float,
+        seed: int,
+        start: multiprocessing.Event,
+        results: multiprocessing.Queue
+) -> None:
+    context = load_context(random.Random(seed + index))
+    rng = context["rng"]
+    latencies = {"read": [], "write": []}
+    errors = {"locked": 0, "conflict": 0}
+    start.wait()
+    deadline = time.perf_counter() + duration
+    try:
+        while time.perf_counter() < deadline:
+            kind = "write" if rng.random() < write_ratio else "read"
+            started = time.perf_counter()
+            try:
+                if kind == "write":
+                    write_request(context)
+                else:
+                    read_request(context)
+            except OperationalError as error:
+                if "locked" not in str(error):
+                    raise
+                errors["locked"] += 1
+                continue
+            except SeatConflictError:
+                errors["conflict"] += 1
+                continue
+            latencies[kind].append((time.perf_counter() - started) * 1000)
+    finally:
+        connection.close()
+        results.put({"latencies": latencies, "errors": errors})
+
+
+def summarize(latencies: list[float], duration: float) -> dict:
+    latencies = sorted(latencies)
+    if not latencies:
+        return {"count": 0, "per_second": 0.0}
+    return {
+        "count": len(latencies),
+        "per_second": len(latencies) / duration,
+        "median_ms": statistics.median(latencies),
+        "p95_ms": latencies[min(len(latencies) - 1,
+                                int(len(latencies) * 0.95))],
+    }
+
+
+def run_profile(
+        profile: str,
+        database: str,
+        processes: int,
+        duration: float,
+        write_ratio: float,
+        seed: int
+) -> dict:
+    context = multiprocessing.get_context("spawn")
+    start = context.Event()
+    results = context.Queue()
+    environ = dict(os.environ)
+    os.environ.update(SQLITE_PROFILE=profile, DATABASE_NAME=database)
+    try:
+        workers = [
+            context.Process(
+                target=run_worker,
+                args=(index, duration, write_ratio, seed, start, results),
+            )
+            for index in range(processes)
+        ]
+        for worker in workers:
+            worker.start()
+    finally:
+        os.environ.clear()
+        os.environ.update(environ)
+
+    start.set()
+    reports = [results.get() for _ in workers]
+    for worker in workers:
+        worker.join()
+
+    latencies = {"read": [], "write": []}
+    errors = {"locked": 0, "conflict": 0}
+    for report in reports:
+        for kind, values in report["latencies"].items():
+            latencies[kind].extend(values)
+        for kind, count in report["errors"].items():
+            errors[kind] += count
+    return {
+        "pragmas": settings.SQLITE_PROFILES[profile]["PRAGMAS"],
+        "reads": summarize(latencies["read"], duration),
+        "writes": summarize(latencies["write"], duration),
+        "errors": errors,
+    }
+
+
+def run_profile_benchmarks(
+        profiles: list[str] = None,
+        processes: int = DEFAULT_PROCESSES,
+        duration: float = DEFAULT_DURATION,
+        write_ratio: float = DEFAULT_WRITE_RATIO,
+        seed: int = 0
+) -> dict:
+    with connection.cursor() as cursor:
+        cursor.execute("PRAGMA journal_mode = DELETE")
+    connection.close()
+
+    results = {}
+    with tempfile.TemporaryDirectory() as directory:
+        for profile in profiles or settings.SQLITE_PROFILES:
+            database = os.path.join(directory, f"{profile}.sqlite3")
+            shutil.copyfile(settings.DATABASES["default"]["NAME"], database)
+            results[profile] = run_profile(
+                profile, database, processes, duration, write_ratio, seed
+            )
+    return results
+
+
+def parse_args(argv: list[str]) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        description="Compare SQLite profiles under multi-process load."
+    )
+    for key, default in DEFAULT_SCALE.items():
+        parser.add_argument(f"--{key}", type=int, default=default)
+    parser.add_argument("--processes", type=int, default=DEFAULT_PROCESSES)
+    parser.add_argument("--duration", type=float, default=DEFAULT_DURATION)
+    parser.add_argument("--write-ratio", type=float,
+                        default=DEFAULT_WRITE_RATIO)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--profiles", nargs="*",
+                        choices=sorted(settings.SQLITE_PROFILES))
+    parser.add_argument("--output", default="benchmark_results_sqlite.json")
+    return parser.parse_args(argv)
+
+
+def main(argv: list[str] = None) -> int:
+    args = parse_args(sys.argv[1:] if argv is None else argv)
+    scale = {key: getattr(args, key) for key in DEFAULT_SCALE}
+    report = {
+        "meta": {
+            "scale": scale,
+            "dataset": prepare_database(scale, args.seed),
+            "processes": args.processes,
+            "duration": args.duration,
+            "write_ratio": args.write_ratio,
+        },
+        "results": run_profile_benchmarks(
+            args.profiles, args.processes, args.duration, args.write_ratio,
+            args.seed,
+        ),
+    }
+    with open(args.output, "w") as output:
+        json.dump(report, output, indent=2)
+
+    for profile, result in report["results"].items():
+        print(f"{profile:12} reads {result['reads']['per_second']:8.1f}/s  "
+              f"writes {result['writes']['per_second']:7.1f}/s  "
+              f"locked {result['errors']['locked']}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,8 @@
+from django.apps import AppConfig
+
+
+class DbConfig(AppConfig):
+    name = "db"
+
+    def ready(self) -> None:
+        from db import signals  # noqa: F401
@@ -0,0 +1,16 @@
+from django.db.backends.sqlite3 import base
+
+
+class DatabaseWrapper(base.DatabaseWrapper):
+    transaction_mode = None
+
+    def get_connection_params(self) -> dict:
+        params = super().get_connection_params()
+        self.transaction_mode = params.pop("transaction_mode", None)
+        return params
+
+    def _start_transaction_under_autocommit(self) -> None:
+        if self.transaction_mode is None:
+            self.cursor().execute("BEGIN")
+        else:
+            self.cursor().execute(f"BEGIN {self.transaction_mode}")
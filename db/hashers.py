@@ -0,0 +1,8 @@
+from django.contrib.auth.hashers import PBKDF2PasswordHasher
+
+
+class FastPBKDF2PasswordHasher(PBKDF2PasswordHasher):
+    iterations = 1000
+
+    def must_update(self, encoded: str) -> bool:
+        return False
@@ -0,0 +1,38 @@
+import sys
+from datetime import datetime
+
+from django.core.management.base import BaseCommand, CommandParser
+
+from services.order_export import EXPORT_FORMATS, export_orders
+
+
+class Command(BaseCommand):
+    help = "Stream orders with tickets as JSON Lines or CSV"  # noqa: VNE003
+
+    def add_arguments(self, parser: CommandParser) -> None:
+        parser.add_argument("--format", choices=EXPORT_FORMATS,
+                            default="jsonl")
+        parser.add_argument("--start", type=datetime.fromisoformat)
+        parser.add_argument("--end", type=datetime.fromisoformat)
+        parser.add_argument("--username")
+        parser.add_argument("--cursor")
+        parser.add_argument("--output")
+
+    def handle(self, *args, **options) -> None:
+        output = (
+            open(options["output"], "a", newline="")
+            if options["output"] else sys.stdout
+        )
+        try:
+            cursor = export_orders(
+                output,
+                export_format=options["format"],
+                start=options["start"],
+                end=options["end"],
+                username=options["username"],
+                cursor=options["cursor"],
+            )
+        finally:
+            if output is not sys.stdout:
+                output.close()
+        self.stderr.write(f"Last cursor: {cursor}")
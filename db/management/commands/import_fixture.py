@@ -0,0 +1,28 @@
+from django.core.management.base import BaseCommand, CommandParser
+
+from services.fixture_import import DEFAULT_BATCH_SIZE, import_fixture
+
+
+class Command(BaseCommand):
+    help = "Stream a fixture into the database in batches"  # noqa: VNE003
+
+    def add_arguments(self, parser: CommandParser) -> None:
+        parser.add_argument("fixture")
+        parser.add_argument(
+            "--batch-size", type=int, default=DEFAULT_BATCH_SIZE
+        )
+        parser.add_argument(
+            "--remap-pks",
+            action="store_true",
+            help="Let the database assign primary keys and remap references",
+        )
+
+    def handle(self, *args, **options) -> None:
+        with open(options["fixture"]) as fixture:
+            counts = import_fixture(
+                fixture,
+                batch_size=options["batch_size"],
+                preserve_pks=not options["remap_pks"],
+            )
+        for label, count in counts.items():
+            self.stdout.write(f"{label}: {count}")
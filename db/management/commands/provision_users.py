@@ -0,0 +1,29 @@
+import json
+
+from django.core.management.base import BaseCommand, CommandParser
+
+from services.user import PROVISION_BATCH_SIZE, provision_users
+
+
+class Command(BaseCommand):
+    help = "Create users in bulk from a JSON Lines file"  # noqa: VNE003
+
+    def add_arguments(self, parser: CommandParser) -> None:
+        parser.add_argument("users")
+        parser.add_argument(
+            "--batch-size", type=int, default=PROVISION_BATCH_SIZE
+        )
+        parser.add_argument(
+            "--processes",
+            type=int,
+            help="Password hashing processes, pooled for large inputs",
+        )
+
+    def handle(self, *args, **options) -> None:
+        with open(options["users"]) as users:
+            created = provision_users(
+                (json.loads(line) for line in users if line.strip()),
+                processes=options["processes"],
+                batch_size=options["batch_size"],
+            )
+        self.stdout.write(f"Provisioned {created} users")
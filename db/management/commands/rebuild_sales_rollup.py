@@ -0,0 +1,27 @@
+from django.core.management.base import BaseCommand, CommandParser
+
+from services.sales_rollup import ROLLUP_BATCH_SIZE, rebuild_sales_rollup
+
+
+class Command(BaseCommand):
+    help = "Rebuild the per day, movie and hall sales rollup"  # noqa: VNE003
+
+    def add_arguments(self, parser: CommandParser) -> None:
+        parser.add_argument(
+            "--start-date",
+            help="First show date to rebuild (YYYY-MM-DD), all when omitted",
+        )
+        parser.add_argument(
+            "--end-date", help="Last show date to rebuild (YYYY-MM-DD)"
+        )
+        parser.add_argument(
+            "--batch-size", type=int, default=ROLLUP_BATCH_SIZE
+        )
+
+    def handle(self, *args, **options) -> None:
+        rows = rebuild_sales_rollup(
+            options["start_date"],
+            options["end_date"],
+            batch_size=options["batch_size"],
+        )
+        self.stdout.write(f"Rebuilt {rows} sales rollup rows")
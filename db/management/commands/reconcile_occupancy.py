@@ -0,0 +1,29 @@
+from django.core.management.base import BaseCommand, CommandParser
+
+from services.occupancy import RECONCILE_BATCH_SIZE, reconcile_occupancy
+
+
+class Command(BaseCommand):
+    help = "Rebuild movie session occupancy counters"  # noqa: VNE003
+
+    def add_arguments(self, parser: CommandParser) -> None:
+        parser.add_argument(
+            "--batch-size", type=int, default=RECONCILE_BATCH_SIZE
+        )
+        parser.add_argument(
+            "--dry-run",
+            action="store_true",
+            help="Report drift without rewriting the counters",
+        )
+
+    def handle(self, *args, **options) -> None:
+        drift = reconcile_occupancy(
+            fix=not options["dry_run"], batch_size=options["batch_size"]
+        )
+        for report in drift:
+            self.stdout.write(
+                f"Movie session {report['movie_session']}: "
+                f"stored {report['sold_count']}, actual {report['actual']}"
+            )
+        action = "Found" if options["dry_run"] else "Fixed"
+        self.stdout.write(f"{action} {len(drift)} drifted movie sessions")
@@ -0,0 +1,16 @@
+from django.core.management.base import BaseCommand, CommandParser
+
+from services.seat_hold import SWEEP_BATCH_SIZE, sweep_expired_holds
+
+
+class Command(BaseCommand):
+    help = "Delete expired seat holds in batches"  # noqa: VNE003
+
+    def add_arguments(self, parser: CommandParser) -> None:
+        parser.add_argument(
+            "--batch-size", type=int, default=SWEEP_BATCH_SIZE
+        )
+
+    def handle(self, *args, **options) -> None:
+        swept = sweep_expired_holds(batch_size=options["batch_size"])
+        self.stdout.write(f"Swept {swept} expired seat holds")
@@ -0,0 +1,21 @@
+from django.core.management.base import BaseCommand, CommandParser
+
+from services.catalog_cache import (
+    WARM_UP_BATCH_SIZE,
+    catalog_cache,
+    warm_up_catalog_cache,
+)
+
+
+class Command(BaseCommand):
+    help = "Load movies and halls into the catalog cache"  # noqa: VNE003
+
+    def add_arguments(self, parser: CommandParser) -> None:
+        parser.add_argument(
+            "--batch-size", type=int, default=WARM_UP_BATCH_SIZE
+        )
+
+    def handle(self, *args, **options) -> None:
+        warmed = warm_up_catalog_cache(batch_size=options["batch_size"])
+        backend = catalog_cache.stats()["backend"]
+        self.stdout.write(f"Cached {warmed} movies in {backend}")
@@ -0,0 +1,17 @@
+# Generated by Django 4.0.2 on 2026-10-17 05:29
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('db', '0004_ticket_related_names'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='order',
+            index=models.Index(fields=['created_at', 'id'], name='db_order_created_11fdeb_idx'),
+        ),
+    ]
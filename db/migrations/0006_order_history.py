@@ -0,0 +1,22 @@
+# Generated by Django 4.0.2 on 2026-10-17 05:29
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('db', '0005_order_created_at_index'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='moviesession',
+            name='price',
+            field=models.DecimalField(decimal_places=2, default=0, max_digits=8),
+        ),
+        migrations.AddIndex(
+            model_name='order',
+            index=models.Index(fields=['user', 'created_at', 'id'], name='db_order_user_id_2f57c1_idx'),
+        ),
+    ]
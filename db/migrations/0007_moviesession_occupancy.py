@@ -0,0 +1,46 @@
+# Generated by Django 4.0.2 on 2026-10-17 05:30
+
+from django.db import migrations, models
+from django.db.models import Count, F
+
+
+def populate_occupancy(apps, schema_editor):
+    MovieSession = apps.get_model("db", "MovieSession")
+    alias = schema_editor.connection.alias
+    sessions = MovieSession.objects.using(alias).annotate(
+        actual=Count("tickets"),
+        capacity=F("cinema_hall__rows") * F("cinema_hall__seats_in_row"),
+    ).filter(actual__gt=0).values_list("id", "actual", "capacity")
+    MovieSession.objects.using(alias).bulk_update(
+        [
+            MovieSession(
+                id=session_id,
+                sold_count=actual,
+                is_sold_out=actual >= capacity,
+            )
+            for session_id, actual, capacity in sessions
+        ],
+        ["sold_count", "is_sold_out"],
+        batch_size=1000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('db', '0006_order_history'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='moviesession',
+            name='is_sold_out',
+            field=models.BooleanField(default=False),
+        ),
+        migrations.AddField(
+            model_name='moviesession',
+            name='sold_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.RunPython(populate_occupancy, migrations.RunPython.noop),
+    ]
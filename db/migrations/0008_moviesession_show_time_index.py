@@ -0,0 +1,22 @@
+# Generated by Django 4.0.2 on 2026-10-17 05:33
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('db', '0007_moviesession_occupancy'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='moviesession',
+            name='show_time',
+            field=models.DateTimeField(db_index=True),
+        ),
+        migrations.AddIndex(
+            model_name='moviesession',
+            index=models.Index(fields=['cinema_hall', 'show_time'], name='db_movieses_cinema__91bc51_idx'),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 4.0.2 on 2026-10-17 05:36
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('db', '0008_moviesession_show_time_index'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='movie',
+            name='duration',
+            field=models.PositiveIntegerField(default=120),
+        ),
+    ]
@@ -0,0 +1,67 @@
+# Generated by Django 4.0.2 on 2026-10-17 06:05
+
+from django.db import migrations, models
+from django.db.models import Count, F, Sum
+from django.db.models.functions import TruncDate
+import django.db.models.deletion
+
+
+def populate_sales_rollup(apps, schema_editor):
+    Ticket = apps.get_model("db", "Ticket")
+    SalesRollup = apps.get_model("db", "SalesRollup")
+    alias = schema_editor.connection.alias
+    sales = Ticket.objects.using(alias).values(
+        show_date=TruncDate("movie_session__show_time"),
+        movie=F("movie_session__movie_id"),
+        hall=F("movie_session__cinema_hall_id"),
+    ).annotate(
+        sold=Count("id"),
+        total=Sum("movie_session__price"),
+    ).order_by()
+    SalesRollup.objects.using(alias).bulk_create(
+        [
+            SalesRollup(
+                date=row["show_date"],
+                movie_id=row["movie"],
+                cinema_hall_id=row["hall"],
+                tickets_sold=row["sold"],
+                revenue=row["total"],
+            )
+            for row in sales
+        ],
+        batch_size=1000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('db', '0009_movie_duration'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SalesRollup',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField()),
+                ('tickets_sold', models.PositiveIntegerField(default=0)),
+                ('revenue', models.DecimalField(decimal_places=2, default=0, max_digits=12)),
+                ('cinema_hall', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='sales', to='db.cinemahall')),
+                ('movie', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='sales', to='db.movie')),
+            ],
+        ),
+        migrations.AddIndex(
+            model_name='salesrollup',
+            index=models.Index(fields=['movie', 'date'], name='db_salesrol_movie_i_2d0423_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='salesrollup',
+            index=models.Index(fields=['cinema_hall', 'date'], name='db_salesrol_cinema__324bb6_idx'),
+        ),
+        migrations.AddConstraint(
+            model_name='salesrollup',
+            constraint=models.UniqueConstraint(fields=('date', 'movie', 'cinema_hall'), name='unique_sales_rollup_key'),
+        ),
+        migrations.RunPython(populate_sales_rollup, migrations.RunPython.noop),
+    ]
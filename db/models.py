@@ -20,11 +20,29 @@ class Actor(models.Model):
         return f"{self.first_name} {self.last_name}"
 
 
+DEFAULT_MOVIE_DURATION = 120
+
+
+class MovieQuerySet(models.QuerySet):
+    def update(self, **kwargs) -> int:
+        kwargs.setdefault("updated_at", timezone.now())
+        return super().update(**kwargs)
+
+
 class Movie(models.Model):
     title = models.CharField(max_length=255, db_index=True)
     description = models.TextField()
+    duration = models.PositiveIntegerField(default=DEFAULT_MOVIE_DURATION)
     actors = models.ManyToManyField(to=Actor, related_name="movies")
     genres = models.ManyToManyField(to=Genre, related_name="movies")
+    updated_at = models.DateTimeField(auto_now=True, db_index=True)
+
+    objects = MovieQuerySet.as_manager()
+
+    def save(self, *args, **kwargs) -> None:
+        if kwargs.get("update_fields") is not None:
+            kwargs["update_fields"] = {*kwargs["update_fields"], "updated_at"}
+        super().save(*args, **kwargs)
 
     def __str__(self) -> str:
         return self.title
@@ -44,13 +62,23 @@ class CinemaHall(models.Model):
 
 
 class MovieSession(models.Model):
-    show_time = models.DateTimeField()
+    show_time = models.DateTimeField(db_index=True)
     cinema_hall = models.ForeignKey(
         to=CinemaHall, on_delete=models.CASCADE, related_name="movie_sessions"
     )
     movie = models.ForeignKey(
         to=Movie, on_delete=models.CASCADE, related_name="movie_sessions"
     )
+    price = models.DecimalField(max_digits=8, decimal_places=2, default=0)
+    sold_count = models.PositiveIntegerField(default=0)
+    is_sold_out = models.BooleanField(default=False)
+
+    class Meta:
+        indexes = [models.Index(fields=["cinema_hall", "show_time"])]
+
+    @property
+    def seats_left(self) -> int:
+        return max(self.cinema_hall.capacity - self.sold_count, 0)
 
     def __str__(self) -> str:
         return f"<{self.movie.title} {str(self.show_time)}>"
@@ -62,14 +90,22 @@ class Order(models.Model):
 
     class Meta:
         ordering = ["-created_at"]
+        indexes = [
+            models.Index(fields=["created_at", "id"]),
+            models.Index(fields=["user", "created_at", "id"]),
+        ]
 
     def __str__(self) -> str:
         return f"{self.created_at}"
 
 
 class Ticket(models.Model):
-    movie_session = models.ForeignKey(MovieSession, on_delete=models.CASCADE)
-    order = models.ForeignKey(Order, on_delete=models.CASCADE)
+    movie_session = models.ForeignKey(
+        MovieSession, on_delete=models.CASCADE, related_name="tickets"
+    )
+    order = models.ForeignKey(
+        Order, on_delete=models.CASCADE, related_name="tickets"
+    )
     row = models.IntegerField()
     seat = models.IntegerField()
 
@@ -101,6 +137,66 @@ class Ticket(models.Model):
         ]
 
 
+class SeatHold(models.Model):
+    movie_session = models.ForeignKey(
+        MovieSession, on_delete=models.CASCADE, related_name="seat_holds"
+    )
+    row = models.IntegerField()
+    seat = models.IntegerField()
+    token = models.CharField(max_length=32, db_index=True)
+    expires_at = models.DateTimeField(db_index=True)
+
+    def __str__(self) -> str:
+        return (f"{self.token} (row: {self.row}, seat: {self.seat}) "
+                f"until {self.expires_at}")
+
+    def clean(self) -> None:
+        cinema_hall = self.movie_session.cinema_hall
+        if not 1 <= self.row <= cinema_hall.rows:
+            raise ValidationError({
+                "row": ["row number must be in available range: "
+                        f"(1, rows): (1, {cinema_hall.rows})"]
+            })
+        if not 1 <= self.seat <= cinema_hall.seats_in_row:
+            raise ValidationError({
+                "seat": ["seat number must be in available range: "
+                         "(1, seats_in_row): "
+                         f"(1, {cinema_hall.seats_in_row})"]
+            })
+
+    class Meta:
+        constraints = [
+            UniqueConstraint(fields=["row", "seat", "movie_session"],
+                             name="unique_row_seat_movie_session_hold")
+        ]
+
+
+class SalesRollup(models.Model):
+    date = models.DateField()
+    movie = models.ForeignKey(
+        to=Movie, on_delete=models.CASCADE, related_name="sales"
+    )
+    cinema_hall = models.ForeignKey(
+        to=CinemaHall, on_delete=models.CASCADE, related_name="sales"
+    )
+    tickets_sold = models.PositiveIntegerField(default=0)
+    revenue = models.DecimalField(max_digits=12, decimal_places=2, default=0)
+
+    def __str__(self) -> str:
+        return (f"{self.date} {self.movie_id}/{self.cinema_hall_id}: "
+                f"{self.tickets_sold} tickets, {self.revenue}")
+
+    class Meta:
+        constraints = [
+            UniqueConstraint(fields=["date", "movie", "cinema_hall"],
+                             name="unique_sales_rollup_key")
+        ]
+        indexes = [
+            models.Index(fields=["movie", "date"]),
+            models.Index(fields=["cinema_hall", "date"]),
+        ]
+
+
 class User(AbstractUser):
     first_name = models.CharField(max_length=255, blank=True)
     last_name = models.CharField(max_length=255, blank=True)
@@ -0,0 +1,19 @@
+from django.db import DEFAULT_DB_ALIAS
+from django.db.models import Model
+
+from services.replicas import current_read_alias, mark_write
+
+
+class ReplicaRouter:
+    def db_for_read(self, model: type[Model], **hints) -> str | None:
+        return current_read_alias()
+
+    def db_for_write(self, model: type[Model], **hints) -> str:
+        mark_write()
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1: Model, obj2: Model, **hints) -> bool:
+        return True
+
+    def allow_migrate(self, db: str, app_label: str, **hints) -> bool:
+        return True
@@ -0,0 +1,198 @@
+from django.conf import settings
+from django.db.backends.base.base import BaseDatabaseWrapper
+from django.db.backends.signals import connection_created
+from django.db.models.signals import (
+    m2m_changed,
+    post_delete,
+    post_save,
+    pre_delete,
+    pre_save,
+)
+from django.dispatch import receiver
+
+from db.models import Actor, CinemaHall, Genre, Movie, MovieSession, Ticket
+from services.catalog_cache import (
+    CINEMA_HALLS_KEY,
+    invalidate_catalog,
+    movie_key,
+)
+from services.occupancy import (
+    adjust_sold_count,
+    adjust_sold_counts,
+    pop_deleted_tickets,
+    reconcile_occupancy,
+    track_deleted_ticket,
+)
+from services.movie_search import movie_search_index
+from services.sales_rollup import adjust_sales, move_session_sales, show_date
+from services.seat_map import invalidate_seat_maps, seat_map_cache
+
+
+SALES_ROLLUP_KEY_FIELDS = {
+    "show_time",
+    "movie",
+    "movie_id",
+    "cinema_hall",
+    "cinema_hall_id",
+    "price",
+}
+SALES_ROLLUP_KEY_ATTNAMES = (
+    "show_time",
+    "movie_id",
+    "cinema_hall_id",
+    "price",
+)
+
+
+@receiver(connection_created)
+def apply_sqlite_pragmas(connection: BaseDatabaseWrapper, **kwargs) -> None:
+    if connection.vendor != "sqlite":
+        return
+    for name, value in getattr(settings, "SQLITE_PRAGMAS", {}).items():
+        connection.connection.execute(f"PRAGMA {name} = {value}")
+
+
+@receiver(post_save, sender=Ticket)
+@receiver(post_delete, sender=Ticket)
+def invalidate_ticket_seat_map(instance: Ticket, **kwargs) -> None:
+    invalidate_seat_maps([instance.movie_session_id])
+
+
+@receiver(post_save, sender=Ticket)
+def count_sold_ticket(instance: Ticket, created: bool, **kwargs) -> None:
+    if created:
+        adjust_sold_count(instance.movie_session_id, 1)
+        adjust_sales({instance.movie_session_id: 1})
+
+
+@receiver(pre_delete, sender=Ticket)
+def track_sold_ticket_delete(instance: Ticket, **kwargs) -> None:
+    track_deleted_ticket(instance)
+
+
+@receiver(post_delete, sender=Ticket)
+def uncount_sold_tickets(**kwargs) -> None:
+    deleted = pop_deleted_tickets()
+    if deleted:
+        deltas = {
+            movie_session_id: -count
+            for movie_session_id, count in deleted.items()
+        }
+        adjust_sold_counts(deltas)
+        adjust_sales(deltas)
+
+
+@receiver(post_save, sender=MovieSession)
+@receiver(post_delete, sender=MovieSession)
+def invalidate_movie_session_seat_map(
+        instance: MovieSession,
+        **kwargs
+) -> None:
+    invalidate_seat_maps([instance.id])
+
+
+def sales_key_value(movie_session: MovieSession, attname: str) -> object:
+    value = MovieSession._meta.get_field(attname).to_python(
+        getattr(movie_session, attname)
+    )
+    return show_date(value) if attname == "show_time" else value
+
+
+@receiver(pre_save, sender=MovieSession)
+def capture_moved_session_sales(
+        instance: MovieSession,
+        update_fields: frozenset = None,
+        **kwargs
+) -> None:
+    if instance._state.adding or (
+        update_fields is not None
+        and not update_fields & SALES_ROLLUP_KEY_FIELDS
+    ):
+        return
+    deferred = instance.get_deferred_fields()
+    previous = MovieSession.objects.filter(id=instance.id).only(
+        *SALES_ROLLUP_KEY_ATTNAMES
+    ).first()
+    if previous is not None and any(
+        sales_key_value(previous, attname)
+        != sales_key_value(instance, attname)
+        for attname in SALES_ROLLUP_KEY_ATTNAMES
+        if attname not in deferred
+    ):
+        instance._previous_sales = previous
+
+
+@receiver(post_save, sender=MovieSession)
+def move_moved_session_sales(instance: MovieSession, **kwargs) -> None:
+    previous = instance.__dict__.pop("_previous_sales", None)
+    if previous is not None:
+        move_session_sales(previous)
+
+
+@receiver(post_save, sender=CinemaHall)
+def invalidate_cinema_hall_seat_maps(
+        instance: CinemaHall,
+        created: bool,
+        **kwargs
+) -> None:
+    if not created:
+        seat_map_cache.clear()
+
+
+@receiver(post_save, sender=CinemaHall)
+def reconcile_cinema_hall_occupancy(
+        instance: CinemaHall,
+        created: bool,
+        **kwargs
+) -> None:
+    if not created:
+        reconcile_occupancy(
+            MovieSession.objects.filter(
+                cinema_hall_id=instance.id
+            ).values("id")
+        )
+
+
+@receiver(post_delete, sender=Movie)
+def unindex_movie_title(instance: Movie, **kwargs) -> None:
+    movie_search_index.remove(instance.id)
+
+
+@receiver(post_save, sender=Movie)
+@receiver(post_delete, sender=Movie)
+def invalidate_cached_movie(instance: Movie, **kwargs) -> None:
+    invalidate_catalog([movie_key(instance.id)])
+
+
+@receiver(post_save, sender=Genre)
+@receiver(post_delete, sender=Genre)
+@receiver(post_save, sender=Actor)
+@receiver(post_delete, sender=Actor)
+def invalidate_cached_movies(created: bool = False, **kwargs) -> None:
+    if not created:
+        invalidate_catalog()
+
+
+@receiver(m2m_changed, sender=Movie.genres.through)
+@receiver(m2m_changed, sender=Movie.actors.through)
+def invalidate_cached_movie_relations(
+        instance: Movie | Genre | Actor,
+        action: str,
+        reverse: bool,
+        pk_set: set[int] | None,
+        **kwargs
+) -> None:
+    if not action.startswith("post_"):
+        return
+    if not reverse:
+        invalidate_catalog([movie_key(instance.id)])
+    elif pk_set is None:
+        invalidate_catalog()
+    else:
+        invalidate_catalog(movie_key(movie_id) for movie_id in pk_set)
+
+
+@receiver(post_save, sender=CinemaHall)
+@receiver(post_delete, sender=CinemaHall)
+def invalidate_cached_cinema_halls(instance: CinemaHall, **kwargs) -> None:
+    invalidate_catalog([CINEMA_HALLS_KEY])
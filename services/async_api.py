@@ -0,0 +1,188 @@
+import asyncio
+import contextvars
+import functools
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable
+
+from django.conf import settings
+from django.db import close_old_connections, connection
+
+from db.models import Movie, MovieSession, Order, Ticket
+from services.movie import get_movie_by_id, get_movies, search_movies
+from services.movie_session import (
+    RECOMMENDATION_LIMIT,
+    find_adjacent_free_seats,
+    free_seat_count,
+    get_movie_session_by_id,
+    get_movies_sessions,
+    get_schedule,
+    get_taken_seats,
+    recommend_seats,
+    validate_recommendation,
+)
+from services.order import (
+    create_order,
+    get_order_history,
+    get_orders,
+    get_tickets_for_order,
+)
+from services.replicas import adopt_write_marker
+from services.seat_hold import hold_seats, release_hold
+from services.seat_map import seat_map_cache
+
+
+SERVICE_THREAD_POOL_SIZE = getattr(settings, "SERVICE_THREAD_POOL_SIZE", 8)
+SERVICE_WRITE_POOL_SIZE = getattr(settings, "SERVICE_WRITE_POOL_SIZE", None)
+
+_executors = {}
+_executors_lock = threading.Lock()
+
+
+def write_pool_size() -> int:
+    if SERVICE_WRITE_POOL_SIZE:
+        return SERVICE_WRITE_POOL_SIZE
+    if connection.vendor == "sqlite":
+        return 1
+    return SERVICE_THREAD_POOL_SIZE
+
+
+def get_executor(kind: str = "read") -> ThreadPoolExecutor:
+    with _executors_lock:
+        executor = _executors.get(kind)
+        if executor is None:
+            executor = _executors[kind] = ThreadPoolExecutor(
+                max_workers=(
+                    write_pool_size() if kind == "write"
+                    else SERVICE_THREAD_POOL_SIZE
+                ),
+                thread_name_prefix=f"services-{kind}",
+            )
+        return executor
+
+
+def shutdown_executors(wait: bool = True) -> None:
+    with _executors_lock:
+        executors = list(_executors.values())
+        _executors.clear()
+    for executor in executors:
+        executor.shutdown(wait=wait)
+
+
+def _call_with_connections(func: Callable, *args, **kwargs) -> Any:
+    close_old_connections()
+    try:
+        return func(*args, **kwargs)
+    finally:
+        close_old_connections()
+
+
+async def _submit(kind: str, func: Callable, args: tuple, kwargs: dict) -> Any:
+    context = contextvars.copy_context()
+    try:
+        return await asyncio.get_running_loop().run_in_executor(
+            get_executor(kind),
+            functools.partial(
+                context.run, _call_with_connections, func, *args, **kwargs
+            ),
+        )
+    finally:
+        adopt_write_marker(context)
+
+
+async def run_in_pool(func: Callable, *args, **kwargs) -> Any:
+    return await _submit("read", func, args, kwargs)
+
+
+async def run_in_write_pool(func: Callable, *args, **kwargs) -> Any:
+    return await _submit("write", func, args, kwargs)
+
+
+def _evaluate(func: Callable) -> Callable:
+    @functools.wraps(func)
+    def evaluate(*args, **kwargs) -> list:
+        return list(func(*args, **kwargs))
+
+    return evaluate
+
+
+async def aget_movies(*args, **kwargs) -> list[Movie]:
+    return await run_in_pool(_evaluate(get_movies), *args, **kwargs)
+
+
+async def asearch_movies(*args, **kwargs) -> list[Movie]:
+    return await run_in_pool(search_movies, *args, **kwargs)
+
+
+async def aget_movie_by_id(movie_id: int) -> Movie:
+    return await run_in_pool(get_movie_by_id, movie_id)
+
+
+async def aget_movies_sessions(session_date: str = None) -> list[MovieSession]:
+    return await run_in_pool(_evaluate(get_movies_sessions), session_date)
+
+
+async def aget_schedule(*args, **kwargs) -> dict:
+    return await run_in_pool(get_schedule, *args, **kwargs)
+
+
+async def aget_movie_session_by_id(movie_session_id: int) -> MovieSession:
+    return await run_in_pool(get_movie_session_by_id, movie_session_id)
+
+
+async def aget_taken_seats(movie_session_id: int) -> list:
+    seat_map = seat_map_cache.peek(movie_session_id)
+    if seat_map is not None:
+        return seat_map.taken_seats()
+    return await run_in_pool(get_taken_seats, movie_session_id)
+
+
+async def afree_seat_count(movie_session_id: int) -> int:
+    seat_map = seat_map_cache.peek(movie_session_id)
+    if seat_map is not None:
+        return seat_map.free_count()
+    return await run_in_pool(free_seat_count, movie_session_id)
+
+
+async def afind_adjacent_free_seats(
+    movie_session_id: int, seats_count: int
+) -> list[dict]:
+    return await run_in_pool(
+        find_adjacent_free_seats, movie_session_id, seats_count
+    )
+
+
+async def arecommend_seats(
+    movie_session_id: int, seats_count: int, limit: int = RECOMMENDATION_LIMIT
+) -> list[dict]:
+    validate_recommendation(seats_count, limit)
+    seat_map = seat_map_cache.peek(movie_session_id)
+    if seat_map is not None:
+        return seat_map.best_free_blocks(seats_count, limit)
+    return await run_in_pool(
+        recommend_seats, movie_session_id, seats_count, limit
+    )
+
+
+async def acreate_order(*args, **kwargs) -> Order:
+    return await run_in_write_pool(create_order, *args, **kwargs)
+
+
+async def aget_orders(username: str = None) -> list[Order]:
+    return await run_in_pool(_evaluate(get_orders), username)
+
+
+async def aget_order_history(*args, **kwargs) -> dict:
+    return await run_in_pool(get_order_history, *args, **kwargs)
+
+
+async def aget_tickets_for_order(order_id: int) -> list[Ticket]:
+    return await run_in_pool(_evaluate(get_tickets_for_order), order_id)
+
+
+async def ahold_seats(*args, **kwargs) -> str:
+    return await run_in_write_pool(hold_seats, *args, **kwargs)
+
+
+async def arelease_hold(hold_token: str) -> int:
+    return await run_in_write_pool(release_hold, hold_token)
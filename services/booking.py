@@ -0,0 +1,229 @@
+import threading
+from collections import Counter
+from contextlib import ExitStack, contextmanager
+from itertools import chain
+from typing import Iterable, Iterator
+
+from django.core.exceptions import NON_FIELD_ERRORS, ValidationError
+from django.db import IntegrityError, connection, transaction
+from django.utils import timezone
+
+from db.models import MovieSession, Order, SeatHold, Ticket
+from services.occupancy import adjust_sold_counts
+from services.sales_rollup import adjust_sales
+from services.seat_map import SeatMap, invalidate_seat_maps, load_seat_map
+
+
+MAX_BOOKING_ATTEMPTS = 3
+
+_session_lock_stripes = [threading.Lock() for _ in range(64)]
+
+
+class SeatConflictError(ValidationError):
+    def __init__(self, conflicts: list[tuple[int, int, int]]) -> None:
+        self.conflicts = [
+            {"movie_session": movie_session_id, "row": row, "seat": seat}
+            for movie_session_id, row, seat in conflicts
+        ]
+        super().__init__({
+            NON_FIELD_ERRORS: [
+                f"seat (row: {row}, seat: {seat}) of movie session "
+                f"{movie_session_id} is already taken"
+                for movie_session_id, row, seat in conflicts
+            ]
+        })
+
+
+@contextmanager
+def local_session_locks(session_ids: Iterable[int]) -> Iterator[None]:
+    if connection.features.has_select_for_update:
+        yield
+        return
+
+    stripes = sorted({
+        session_id % len(_session_lock_stripes) for session_id in session_ids
+    })
+    with ExitStack() as stack:
+        for stripe in stripes:
+            stack.enter_context(_session_lock_stripes[stripe])
+        yield
+
+
+def lock_sessions_for_update(session_ids: Iterable[int]) -> None:
+    if connection.features.has_select_for_update:
+        list(
+            MovieSession.objects.select_for_update().filter(
+                id__in=session_ids
+            ).values_list("id", flat=True)
+        )
+
+
+def get_sessions_with_halls(session_ids: set[int]) -> dict[int, MovieSession]:
+    return MovieSession.objects.select_related("cinema_hall").in_bulk(
+        session_ids
+    )
+
+
+def get_held_seats(hold_token: str) -> list[dict]:
+    held_seats = list(
+        SeatHold.objects.filter(
+            token=hold_token, expires_at__gt=timezone.now()
+        ).values("row", "seat", "movie_session")
+    )
+    if not held_seats:
+        raise ValidationError({
+            "hold_token": [
+                f"seat hold {hold_token} has expired or does not exist"
+            ]
+        })
+    return held_seats
+
+
+def get_booked_sessions(
+        tickets: list[dict]
+) -> dict[int, MovieSession]:
+    sessions = get_sessions_with_halls(
+        {ticket["movie_session"] for ticket in tickets}
+    )
+    missing = sorted(
+        {ticket["movie_session"] for ticket in tickets} - set(sessions)
+    )
+    if missing:
+        raise ValidationError({
+            "movie_session": [
+                f"movie session instance with id {movie_session_id} "
+                f"does not exist."
+                for movie_session_id in missing
+            ]
+        })
+    return sessions
+
+
+def build_tickets(order: Order, tickets: list[dict]) -> list[Ticket]:
+    sessions = get_booked_sessions(tickets)
+    new_tickets = []
+    for ticket_data in tickets:
+        ticket = Ticket(
+            movie_session=sessions[ticket_data["movie_session"]],
+            order=order,
+            row=ticket_data["row"],
+            seat=ticket_data["seat"],
+        )
+        ticket.clean_fields(exclude=["movie_session", "order"])
+        ticket.clean()
+        new_tickets.append(ticket)
+    return new_tickets
+
+
+def booking_session_ids(
+        tickets: list[dict],
+        hold_token: str = None
+) -> set[int]:
+    if tickets or not hold_token:
+        return {ticket["movie_session"] for ticket in tickets}
+    return set(
+        SeatHold.objects.filter(token=hold_token).values_list(
+            "movie_session_id", flat=True
+        )
+    )
+
+
+def find_taken_seats(
+        tickets: list[Ticket],
+        hold_token: str = None
+) -> list[tuple[int, int, int]]:
+    requested = set()
+    conflicts = []
+    for ticket in tickets:
+        key = (ticket.movie_session_id, ticket.row, ticket.seat)
+        if key in requested:
+            conflicts.append(key)
+        requested.add(key)
+
+    seats_filter = {
+        "movie_session_id__in": {key[0] for key in requested},
+        "row__in": {key[1] for key in requested},
+        "seat__in": {key[2] for key in requested},
+    }
+    sold = Ticket.objects.filter(**seats_filter).values_list(
+        "movie_session_id", "row", "seat"
+    )
+    held = SeatHold.objects.filter(
+        expires_at__gt=timezone.now(), **seats_filter
+    ).exclude(token=hold_token).values_list("movie_session_id", "row", "seat")
+    conflicts.extend(key for key in chain(sold, held) if key in requested)
+    return sorted(set(conflicts))
+
+
+def _nearest_free_seat(
+        seat_map: SeatMap,
+        row: int,
+        seat: int
+) -> tuple[int, int] | None:
+    return min(
+        seat_map.iter_free_blocks(1),
+        key=lambda position: (
+            abs(position[0] - row), abs(position[1] - seat), position
+        ),
+        default=None,
+    )
+
+
+def replace_taken_seats(
+        tickets: list[Ticket],
+        hold_token: str = None
+) -> list[Ticket]:
+    seat_maps = {}
+    for ticket in tickets:
+        seat_map = seat_maps.get(ticket.movie_session_id)
+        if seat_map is None:
+            seat_map = load_seat_map(ticket.movie_session_id, hold_token)
+            seat_maps[ticket.movie_session_id] = seat_map
+        if seat_map.is_taken(ticket.row, ticket.seat):
+            position = _nearest_free_seat(seat_map, ticket.row, ticket.seat)
+            if position is None:
+                raise SeatConflictError(
+                    [(ticket.movie_session_id, ticket.row, ticket.seat)]
+                )
+            ticket.row, ticket.seat = position
+        seat_map.take(ticket.row, ticket.seat)
+    return tickets
+
+
+def book_tickets(
+        order: Order,
+        tickets: list[dict],
+        replace_taken: bool = False,
+        hold_token: str = None
+) -> list[Ticket]:
+    if hold_token and not tickets:
+        tickets = get_held_seats(hold_token)
+    new_tickets = build_tickets(order, tickets)
+    if not new_tickets:
+        return []
+
+    lock_sessions_for_update(
+        {ticket.movie_session_id for ticket in new_tickets}
+    )
+    for _ in range(MAX_BOOKING_ATTEMPTS):
+        conflicts = find_taken_seats(new_tickets, hold_token)
+        if conflicts:
+            if not replace_taken:
+                raise SeatConflictError(conflicts)
+            new_tickets = replace_taken_seats(new_tickets, hold_token)
+        try:
+            with transaction.atomic():
+                created = Ticket.objects.bulk_create(new_tickets)
+        except IntegrityError:
+            continue
+        sold = Counter(ticket.movie_session_id for ticket in created)
+        adjust_sold_counts(sold)
+        adjust_sales(sold, {
+            ticket.movie_session_id: ticket.movie_session
+            for ticket in created
+        }.values())
+        if hold_token:
+            SeatHold.objects.filter(token=hold_token).delete()
+        invalidate_seat_maps(ticket.movie_session_id for ticket in created)
+        return created
+    raise SeatConflictError(find_taken_seats(new_tickets, hold_token))
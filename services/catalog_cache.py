@@ -0,0 +1,235 @@
+import copy
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Iterable
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import transaction
+from django.db.models import Model, QuerySet
+
+from db.models import CinemaHall, Movie
+
+
+CATALOG_CACHE_SETTINGS = {
+    "BACKEND": "local",
+    "TTL": 300,
+    "MAXSIZE": 4096,
+    "ALIAS": "default",
+    **getattr(settings, "CATALOG_CACHE", {}),
+}
+WARM_UP_BATCH_SIZE = 500
+CINEMA_HALLS_KEY = "cinema_halls"
+
+MISSING = object()
+
+
+def copy_cached(value: Any) -> Any:
+    if isinstance(value, QuerySet):
+        clone = value.all()
+        clone._result_cache = [copy_cached(item) for item in value]
+        clone._prefetch_done = value._prefetch_done
+        return clone
+    if isinstance(value, Model):
+        clone = copy.copy(value)
+        prefetched = getattr(value, "_prefetched_objects_cache", None)
+        if prefetched is not None:
+            clone._prefetched_objects_cache = {
+                name: copy_cached(related)
+                for name, related in prefetched.items()
+            }
+        return clone
+    return value
+
+
+class LocalCacheBackend:
+    def __init__(self, maxsize: int = 4096, ttl: float = 300) -> None:
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def size(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: str) -> Any:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return MISSING
+            expires_at, value = entry
+            if expires_at <= time.monotonic():
+                del self._entries[key]
+                return MISSING
+            self._entries.move_to_end(key)
+            return value
+
+    def set_many(self, values: dict[str, Any]) -> None:
+        expires_at = time.monotonic() + self.ttl
+        with self._lock:
+            for key, value in values.items():
+                self._entries[key] = (expires_at, value)
+                self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def delete_many(self, keys: Iterable[str]) -> None:
+        with self._lock:
+            for key in keys:
+                self._entries.pop(key, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+
+class DjangoCacheBackend:
+    def __init__(
+            self,
+            alias: str = "default",
+            ttl: float = 300,
+            prefix: str = "catalog"
+    ) -> None:
+        self.cache = caches[alias]
+        self.ttl = ttl
+        self.prefix = prefix
+
+    def size(self) -> None:
+        return None
+
+    def _version(self) -> int:
+        return self.cache.get_or_set(f"{self.prefix}:version", 1, None)
+
+    def get(self, key: str) -> Any:
+        return self.cache.get(
+            f"{self.prefix}:{key}", MISSING, version=self._version()
+        )
+
+    def set_many(self, values: dict[str, Any]) -> None:
+        self.cache.set_many(
+            {f"{self.prefix}:{key}": value for key, value in values.items()},
+            self.ttl,
+            version=self._version(),
+        )
+
+    def delete_many(self, keys: Iterable[str]) -> None:
+        self.cache.delete_many(
+            [f"{self.prefix}:{key}" for key in keys], version=self._version()
+        )
+
+    def clear(self) -> None:
+        self.cache.set(f"{self.prefix}:version", self._version() + 1, None)
+
+
+class CatalogCache:
+    def __init__(
+            self,
+            backend: LocalCacheBackend | DjangoCacheBackend
+    ) -> None:
+        self.backend = backend
+        self.hits = 0
+        self.misses = 0
+        self._generation = 0
+        self._lock = threading.Lock()
+
+    def get_or_load(self, key: str, loader: Callable[[], Any]) -> Any:
+        value = self.backend.get(key)
+        with self._lock:
+            if value is not MISSING:
+                self.hits += 1
+                return copy_cached(value)
+            self.misses += 1
+            generation = self._generation
+
+        value = loader()
+        with self._lock:
+            if generation == self._generation:
+                self.backend.set_many({key: value})
+        return copy_cached(value)
+
+    def set_many(self, values: dict[str, Any]) -> None:
+        self.backend.set_many(values)
+
+    def invalidate(self, keys: Iterable[str]) -> None:
+        with self._lock:
+            self._generation += 1
+            self.backend.delete_many(keys)
+
+    def invalidate_all(self) -> None:
+        with self._lock:
+            self._generation += 1
+            self.backend.clear()
+
+    def clear(self) -> None:
+        self.invalidate_all()
+        with self._lock:
+            self.hits = 0
+            self.misses = 0
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "backend": type(self.backend).__name__,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "size": self.backend.size(),
+            }
+
+
+def create_catalog_cache(options: dict = None) -> CatalogCache:
+    options = {**CATALOG_CACHE_SETTINGS, **(options or {})}
+    if options["BACKEND"] == "django":
+        backend = DjangoCacheBackend(options["ALIAS"], options["TTL"])
+    elif options["BACKEND"] == "local":
+        backend = LocalCacheBackend(options["MAXSIZE"], options["TTL"])
+    else:
+        raise ValueError(f"unknown catalog cache backend {options['BACKEND']}")
+    return CatalogCache(backend)
+
+
+catalog_cache = create_catalog_cache()
+
+
+def movie_key(movie_id: int) -> str:
+    return f"movie:{movie_id}"
+
+
+def invalidate_catalog(keys: Iterable[str] = None) -> None:
+    keys = None if keys is None else set(keys)
+
+    def invalidate() -> None:
+        if keys is None:
+            catalog_cache.invalidate_all()
+        else:
+            catalog_cache.invalidate(keys)
+
+    invalidate()
+    transaction.on_commit(invalidate)
+
+
+def load_movie(movie_id: int) -> Movie:
+    return Movie.objects.prefetch_related("genres", "actors").get(id=movie_id)
+
+
+def load_cinema_halls() -> QuerySet[CinemaHall]:
+    queryset = CinemaHall.objects.all()
+    len(queryset)
+    return queryset
+
+
+def warm_up_catalog_cache(batch_size: int = WARM_UP_BATCH_SIZE) -> int:
+    catalog_cache.set_many({CINEMA_HALLS_KEY: load_cinema_halls()})
+    warmed = 0
+    movie_ids = list(Movie.objects.order_by("id").values_list("id", flat=True))
+    for start in range(0, len(movie_ids), batch_size):
+        movies = Movie.objects.prefetch_related("genres", "actors").in_bulk(
+            movie_ids[start:start + batch_size]
+        )
+        catalog_cache.set_many({
+            movie_key(movie_id): movie for movie_id, movie in movies.items()
+        })
+        warmed += len(movies)
+    return warmed
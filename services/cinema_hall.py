@@ -1,12 +1,20 @@
 from django.db.models import QuerySet
 
 from db.models import CinemaHall
+from services.catalog_cache import (
+    CINEMA_HALLS_KEY,
+    catalog_cache,
+    load_cinema_halls,
+)
+from services.instrumentation import instrument
 
 
+@instrument
 def get_cinema_halls() -> QuerySet:
-    return CinemaHall.objects.all()
+    return catalog_cache.get_or_load(CINEMA_HALLS_KEY, load_cinema_halls)
 
 
+@instrument
 def create_cinema_hall(
     hall_name: str, hall_rows: int, hall_seats_in_row: int
 ) -> CinemaHall:
@@ -0,0 +1,213 @@
+import json
+from collections import Counter
+from typing import Iterator, TextIO
+
+from django.apps import apps
+from django.core.management.color import no_style
+from django.db import connection, transaction
+from django.db.models import Model
+
+from services.catalog_cache import catalog_cache
+from services.movie_search import movie_search_index
+from services.occupancy import reconcile_occupancy
+from services.sales_rollup import rebuild_sales_rollup
+from services.seat_map import seat_map_cache
+
+
+DEFAULT_BATCH_SIZE = 2000
+READ_CHUNK_SIZE = 1 << 16
+
+IMPORT_ORDER = (
+    "db.cinemahall",
+    "db.genre",
+    "db.actor",
+    "db.movie",
+    "db.movie.genres",
+    "db.movie.actors",
+    "db.moviesession",
+    "db.user",
+    "db.user.groups",
+    "db.user.user_permissions",
+    "db.order",
+    "db.ticket",
+    "db.seathold",
+)
+
+
+def referenced_models() -> set[str]:
+    return {
+        field.related_model._meta.label_lower
+        for key in IMPORT_ORDER if key.count(".") == 1
+        for field in apps.get_model(key)._meta.get_fields()
+        if field.is_relation and field.concrete
+    }
+
+
+def iter_fixture_records(
+        stream: TextIO,
+        chunk_size: int = READ_CHUNK_SIZE
+) -> Iterator[dict]:
+    decoder = json.JSONDecoder()
+    buffer = ""
+    position = 0
+    started = False
+    exhausted = False
+    while True:
+        while position < len(buffer) and buffer[position] in " \t\r\n,":
+            position += 1
+        if position == len(buffer):
+            if exhausted:
+                raise ValueError("fixture ended before the closing bracket")
+            buffer = stream.read(chunk_size)
+            position = 0
+            exhausted = not buffer
+            continue
+        if not started:
+            if buffer[position] != "[":
+                raise ValueError("fixture must be a JSON array of records")
+            started = True
+            position += 1
+            continue
+        if buffer[position] == "]":
+            return
+        try:
+            record, position = decoder.raw_decode(buffer, position)
+        except json.JSONDecodeError:
+            chunk = stream.read(chunk_size)
+            if not chunk:
+                raise
+            buffer = buffer[position:] + chunk
+            position = 0
+            continue
+        yield record
+        if position >= chunk_size:
+            buffer = buffer[position:]
+            position = 0
+
+
+class FixtureImporter:
+    def __init__(
+            self,
+            batch_size: int = DEFAULT_BATCH_SIZE,
+            preserve_pks: bool = True
+    ) -> None:
+        if (
+            not preserve_pks
+            and not connection.features.can_return_rows_from_bulk_insert
+        ):
+            raise ValueError(
+                "remapping primary keys needs a database that returns "
+                "rows from bulk inserts"
+            )
+        self.batch_size = batch_size
+        self.preserve_pks = preserve_pks
+        self.id_maps = {}
+        self.referenced = referenced_models()
+        self.counts = Counter()
+        self.buffers = {key: [] for key in IMPORT_ORDER}
+
+    def add(self, record: dict) -> None:
+        label = record["model"]
+        if label not in self.buffers or label.count(".") != 1:
+            raise ValueError(f"unsupported fixture model {label}")
+        self.buffers[label].append(record)
+        if len(self.buffers[label]) >= self.batch_size:
+            self.flush(label)
+
+    def flush(self, until: str = IMPORT_ORDER[-1]) -> None:
+        for key in IMPORT_ORDER[:IMPORT_ORDER.index(until) + 1]:
+            if self.buffers[key]:
+                self._flush_buffer(key)
+
+    def resolve(self, related_model: type[Model], fixture_pk: int) -> int:
+        id_map = self.id_maps.get(related_model._meta.label_lower)
+        if id_map is None or fixture_pk is None:
+            return fixture_pk
+        try:
+            return id_map[fixture_pk]
+        except KeyError:
+            raise ValueError(
+                f"{related_model._meta.label_lower} with pk {fixture_pk} "
+                f"is referenced before it is imported"
+            )
+
+    def _flush_buffer(self, key: str) -> None:
+        objects = self.buffers[key]
+        self.buffers[key] = []
+        if key.count(".") == 2:
+            objects[0].__class__.objects.bulk_create(objects)
+            self.counts[key] += len(objects)
+            return
+
+        model = apps.get_model(key)
+        instances = []
+        links = []
+        for record in objects:
+            instance = model()
+            if self.preserve_pks:
+                instance.pk = model._meta.pk.to_python(record["pk"])
+            for name, field_value in record["fields"].items():
+                field = model._meta.get_field(name)
+                if field.many_to_many:
+                    links.append((len(instances), field, field_value))
+                elif field.is_relation:
+                    setattr(instance, field.attname,
+                            self.resolve(field.related_model, field_value))
+                else:
+                    setattr(instance, field.attname,
+                            field.to_python(field_value))
+            instances.append(instance)
+        model.objects.bulk_create(instances)
+        self.counts[key] += len(instances)
+
+        if not self.preserve_pks and key in self.referenced:
+            id_map = self.id_maps.setdefault(key, {})
+            for record, instance in zip(objects, instances):
+                id_map[record["pk"]] = instance.pk
+
+        for index, field, related_pks in links:
+            through = field.remote_field.through
+            link_key = f"{key}.{field.name}"
+            self.buffers[link_key].extend(
+                through(**{
+                    f"{field.m2m_field_name()}_id": instances[index].pk,
+                    f"{field.m2m_reverse_field_name()}_id": self.resolve(
+                        field.related_model, related_pk
+                    ),
+                })
+                for related_pk in related_pks
+            )
+            if len(self.buffers[link_key]) >= self.batch_size:
+                self._flush_buffer(link_key)
+
+    def finish(self) -> dict:
+        self.flush()
+        imported_models = [
+            apps.get_model(key) for key in IMPORT_ORDER
+            if key.count(".") == 1 and self.counts[key]
+        ]
+        if self.preserve_pks and imported_models:
+            with connection.cursor() as cursor:
+                for sql in connection.ops.sequence_reset_sql(
+                    no_style(), imported_models
+                ):
+                    cursor.execute(sql)
+        if self.counts["db.ticket"] or self.counts["db.moviesession"]:
+            reconcile_occupancy(batch_size=self.batch_size)
+            rebuild_sales_rollup(batch_size=self.batch_size)
+        seat_map_cache.clear()
+        movie_search_index.clear()
+        catalog_cache.invalidate_all()
+        return dict(self.counts)
+
+
+@transaction.atomic
+def import_fixture(
+        stream: TextIO,
+        batch_size: int = DEFAULT_BATCH_SIZE,
+        preserve_pks: bool = True
+) -> dict:
+    importer = FixtureImporter(batch_size, preserve_pks)
+    for record in iter_fixture_records(stream):
+        importer.add(record)
+    return importer.finish()
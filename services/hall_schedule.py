@@ -0,0 +1,222 @@
+import datetime
+import threading
+from bisect import bisect_left, insort
+from collections import defaultdict
+from contextlib import ExitStack, contextmanager
+from typing import Iterable, Iterator
+
+from django.core.exceptions import NON_FIELD_ERRORS, ValidationError
+from django.db import connection, transaction
+from django.db.models import Max
+
+from db.models import CinemaHall, Movie, MovieSession
+
+
+class ScheduleConflictError(ValidationError):
+    def __init__(self, conflicts: list[dict]) -> None:
+        self.conflicts = conflicts
+        super().__init__({
+            NON_FIELD_ERRORS: [
+                f"cinema hall {conflict['cinema_hall']} is already taken at "
+                f"{conflict['show_time']}"
+                for conflict in conflicts
+            ]
+        })
+
+
+def session_interval(
+        show_time: datetime.datetime | str,
+        duration: int
+) -> tuple[datetime.datetime, datetime.datetime]:
+    start = MovieSession._meta.get_field("show_time").to_python(show_time)
+    return start, start + datetime.timedelta(minutes=duration)
+
+
+class HallScheduleIndex:
+    def __init__(self) -> None:
+        self.loaded = False
+        self._halls = defaultdict(list)
+        self._sessions = {}
+        self._max_duration = datetime.timedelta(0)
+        self._lock = threading.RLock()
+
+    def __len__(self) -> int:
+        return len(self._sessions)
+
+    def clear(self) -> None:
+        with self._lock:
+            self.loaded = False
+            self._halls.clear()
+            self._sessions.clear()
+            self._max_duration = datetime.timedelta(0)
+
+    def load(
+            self,
+            sessions: Iterable[
+                tuple[int, int, datetime.datetime, datetime.datetime]
+            ]
+    ) -> None:
+        with self._lock:
+            self.clear()
+            for session_id, hall_id, start, end in sessions:
+                self._sessions[session_id] = (hall_id, start, end)
+                self._halls[hall_id].append((start, end, session_id))
+                self._max_duration = max(self._max_duration, end - start)
+            for intervals in self._halls.values():
+                intervals.sort()
+            self.loaded = True
+
+    def add(
+            self,
+            session_id: int,
+            hall_id: int,
+            start: datetime.datetime,
+            end: datetime.datetime
+    ) -> None:
+        with self._lock:
+            self.remove(session_id)
+            self._sessions[session_id] = (hall_id, start, end)
+            insort(self._halls[hall_id], (start, end, session_id))
+            self._max_duration = max(self._max_duration, end - start)
+
+    def remove(self, session_id: int) -> None:
+        with self._lock:
+            entry = self._sessions.pop(session_id, None)
+            if entry is None:
+                return
+            hall_id, start, end = entry
+            intervals = self._halls[hall_id]
+            del intervals[bisect_left(intervals, (start, end, session_id))]
+            if not intervals:
+                del self._halls[hall_id]
+
+    def overlapping(
+            self,
+            hall_id: int,
+            start: datetime.datetime,
+            end: datetime.datetime,
+            exclude: int = None
+    ) -> list[int]:
+        with self._lock:
+            intervals = self._halls.get(hall_id, [])
+            low = bisect_left(intervals, (start - self._max_duration,))
+            high = bisect_left(intervals, (end,))
+            return [
+                session_id
+                for _, session_end, session_id in intervals[low:high]
+                if session_end > start and session_id != exclude
+            ]
+
+
+_hall_lock_stripes = [threading.Lock() for _ in range(64)]
+
+
+@contextmanager
+def hall_schedule_lock(hall_ids: Iterable[int]) -> Iterator[None]:
+    hall_ids = sorted(set(hall_ids))
+    if connection.features.has_select_for_update:
+        with transaction.atomic():
+            list(
+                CinemaHall.objects.select_for_update().filter(
+                    id__in=hall_ids
+                ).order_by("id").values_list("id", flat=True)
+            )
+            yield
+        return
+
+    stripes = sorted({
+        hall_id % len(_hall_lock_stripes) for hall_id in hall_ids
+    })
+    with ExitStack() as stack:
+        for stripe in stripes:
+            stack.enter_context(_hall_lock_stripes[stripe])
+        with transaction.atomic():
+            yield
+
+
+def load_hall_schedule(
+        hall_ids: set[int],
+        start: datetime.datetime,
+        end: datetime.datetime
+) -> HallScheduleIndex:
+    longest = Movie.objects.aggregate(longest=Max("duration"))["longest"]
+    index = HallScheduleIndex()
+    index.load(
+        (session_id, hall_id, *session_interval(show_time, duration))
+        for session_id, hall_id, show_time, duration
+        in MovieSession.objects.filter(
+            cinema_hall_id__in=hall_ids,
+            show_time__gte=start - datetime.timedelta(minutes=longest or 0),
+            show_time__lt=end,
+        ).values_list(
+            "id", "cinema_hall_id", "show_time", "movie__duration"
+        ).iterator(chunk_size=5000)
+    )
+    return index
+
+
+def get_movie_durations(movie_ids: set[int]) -> dict[int, int]:
+    durations = dict(
+        Movie.objects.filter(id__in=movie_ids).values_list("id", "duration")
+    )
+    missing = movie_ids - set(durations)
+    if missing:
+        raise ValidationError({
+            "movie": [
+                f"movie instance with id {movie_id} does not exist."
+                for movie_id in sorted(missing)
+            ]
+        })
+    return durations
+
+
+def find_schedule_conflicts(
+        sessions: list[MovieSession],
+        durations: dict[int, int] = None
+) -> list[dict]:
+    if not sessions:
+        return []
+    if durations is None:
+        durations = get_movie_durations(
+            {movie_session.movie_id for movie_session in sessions}
+        )
+    intervals = [
+        session_interval(
+            movie_session.show_time, durations[movie_session.movie_id]
+        )
+        for movie_session in sessions
+    ]
+    index = load_hall_schedule(
+        {movie_session.cinema_hall_id for movie_session in sessions},
+        min(start for start, _ in intervals),
+        max(end for _, end in intervals),
+    )
+    batch = HallScheduleIndex()
+    conflicts = []
+    for position, (movie_session, (start, end)) in enumerate(
+            zip(sessions, intervals)
+    ):
+        hall_id = movie_session.cinema_hall_id
+        conflict = {
+            "index": position,
+            "cinema_hall": hall_id,
+            "show_time": start,
+        }
+        conflicts.extend(
+            {**conflict, "conflicts_with": session_id}
+            for session_id in index.overlapping(
+                hall_id, start, end, exclude=movie_session.pk
+            )
+        )
+        conflicts.extend(
+            {**conflict, "conflicts_with_index": other}
+            for other in batch.overlapping(hall_id, start, end)
+        )
+        batch.add(position, hall_id, start, end)
+    return conflicts
+
+
+def validate_schedule(sessions: list[MovieSession]) -> None:
+    conflicts = find_schedule_conflicts(sessions)
+    if conflicts:
+        raise ScheduleConflictError(conflicts)
@@ -0,0 +1,277 @@
+import json
+import threading
+import time
+from contextlib import ExitStack, contextmanager
+from contextvars import ContextVar
+from functools import wraps
+from typing import Any, Callable, Iterator
+
+from django.conf import settings
+from django.db import connections
+from django.db.models import QuerySet
+
+
+LATENCY_BUCKETS = (
+    0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0
+)
+
+
+_active_counter = ContextVar("active_query_counter", default=None)
+
+
+class QueryCounter:
+    def __init__(self) -> None:
+        self.count = 0
+
+
+def count_query(
+        execute: Callable,
+        sql: str,
+        params: Any,
+        many: bool,
+        context: dict
+) -> Any:
+    counter = _active_counter.get()
+    if counter is not None:
+        counter.count += 1
+    return execute(sql, params, many, context)
+
+
+@contextmanager
+def counting_queries() -> Iterator[QueryCounter]:
+    counter = QueryCounter()
+    token = _active_counter.set(counter)
+    try:
+        with ExitStack() as stack:
+            for db_connection in connections.all():
+                if count_query not in db_connection.execute_wrappers:
+                    stack.enter_context(
+                        db_connection.execute_wrapper(count_query)
+                    )
+            yield counter
+    finally:
+        _active_counter.reset(token)
+
+
+class FunctionStats:
+    def __init__(self) -> None:
+        self.calls = 0
+        self.total_seconds = 0.0
+        self.queries = 0
+        self.rows = 0
+        self.buckets = [0] * len(LATENCY_BUCKETS)
+
+    def record(self, seconds: float, queries: int, rows: int) -> None:
+        self.calls += 1
+        self.total_seconds += seconds
+        self.queries += queries
+        self.rows += rows
+        for index, bound in enumerate(LATENCY_BUCKETS):
+            if seconds <= bound:
+                self.buckets[index] += 1
+                break
+
+    def as_dict(self) -> dict:
+        cumulative = 0
+        histogram = {}
+        for bound, count in zip(LATENCY_BUCKETS, self.buckets):
+            cumulative += count
+            histogram[str(bound)] = cumulative
+        histogram["+Inf"] = self.calls
+        return {
+            "calls": self.calls,
+            "total_seconds": self.total_seconds,
+            "queries": self.queries,
+            "rows": self.rows,
+            "latency_histogram": histogram,
+        }
+
+
+class InstrumentationRegistry:
+    def __init__(self, enabled: bool = False) -> None:
+        self.enabled = enabled
+        self._stats = {}
+        self._lock = threading.Lock()
+
+    def enable(self) -> None:
+        self.enabled = True
+
+    def disable(self) -> None:
+        self.enabled = False
+
+    def reset(self) -> None:
+        with self._lock:
+            self._stats.clear()
+
+    def _stats_for(self, name: str) -> FunctionStats:
+        stats = self._stats.get(name)
+        if stats is None:
+            stats = self._stats[name] = FunctionStats()
+        return stats
+
+    def record(
+            self,
+            name: str,
+            seconds: float,
+            queries: int,
+            rows: int
+    ) -> None:
+        with self._lock:
+            self._stats_for(name).record(seconds, queries, rows)
+
+    def record_fetch(self, name: str, queries: int, rows: int) -> None:
+        with self._lock:
+            stats = self._stats_for(name)
+            stats.queries += queries
+            stats.rows += rows
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            return {
+                name: stats.as_dict()
+                for name, stats in sorted(self._stats.items())
+            }
+
+    def to_json(self) -> str:
+        return json.dumps(self.snapshot(), indent=2)
+
+    def to_prometheus(self) -> str:
+        snapshot = self.snapshot()
+        lines = [
+            "# HELP service_calls_total Number of service function calls.",
+            "# TYPE service_calls_total counter",
+        ]
+        lines.extend(
+            f'service_calls_total{{function="{name}"}} {stats["calls"]}'
+            for name, stats in snapshot.items()
+        )
+        lines.extend([
+            "# HELP service_queries_total SQL queries issued by services.",
+            "# TYPE service_queries_total counter",
+        ])
+        lines.extend(
+            f'service_queries_total{{function="{name}"}} {stats["queries"]}'
+            for name, stats in snapshot.items()
+        )
+        lines.extend([
+            "# HELP service_rows_fetched_total Rows returned by services.",
+            "# TYPE service_rows_fetched_total counter",
+        ])
+        lines.extend(
+            f'service_rows_fetched_total{{function="{name}"}} '
+            f'{stats["rows"]}'
+            for name, stats in snapshot.items()
+        )
+        lines.extend([
+            "# HELP service_call_duration_seconds Service call latency.",
+            "# TYPE service_call_duration_seconds histogram",
+        ])
+        for name, stats in snapshot.items():
+            for bound, count in stats["latency_histogram"].items():
+                lines.append(
+                    f"service_call_duration_seconds_bucket"
+                    f'{{function="{name}",le="{bound}"}} {count}'
+                )
+            lines.append(
+                f'service_call_duration_seconds_sum{{function="{name}"}} '
+                f'{stats["total_seconds"]}'
+            )
+            lines.append(
+                f'service_call_duration_seconds_count{{function="{name}"}} '
+                f'{stats["calls"]}'
+            )
+        return "\n".join(lines) + "\n"
+
+
+registry = InstrumentationRegistry(
+    enabled=getattr(settings, "SERVICE_INSTRUMENTATION", False)
+)
+
+
+def rebuild_queryset(base: type[QuerySet], state: dict) -> QuerySet:
+    queryset = base.__new__(base)
+    queryset.__setstate__(state)
+    return queryset
+
+
+class InstrumentedQuerySet:
+    instrumented_name = ""
+    instrumented_base = QuerySet
+
+    def _fetch_all(self) -> None:
+        if self._result_cache is not None or not registry.enabled:
+            return super()._fetch_all()
+        with counting_queries() as counter:
+            super()._fetch_all()
+        registry.record_fetch(
+            self.instrumented_name, counter.count, len(self._result_cache)
+        )
+
+    def __reduce__(self) -> tuple:
+        return rebuild_queryset, (self.instrumented_base, self.__getstate__())
+
+
+_instrumented_querysets = {}
+
+
+def instrument_queryset(queryset: QuerySet, name: str) -> QuerySet:
+    base = queryset.__class__
+    if issubclass(base, InstrumentedQuerySet):
+        base = base.instrumented_base
+    instrumented = _instrumented_querysets.get((base, name))
+    if instrumented is None:
+        instrumented = _instrumented_querysets[(base, name)] = type(
+            base.__name__,
+            (InstrumentedQuerySet, base),
+            {"instrumented_name": name, "instrumented_base": base},
+        )
+    queryset = queryset._chain()
+    queryset.__class__ = instrumented
+    return queryset
+
+
+def count_rows(returned: Any) -> int:
+    if isinstance(returned, QuerySet):
+        if returned._result_cache is None:
+            return 0
+        return len(returned._result_cache)
+    if isinstance(returned, (list, tuple, dict, set)):
+        return len(returned)
+    return 0 if returned is None else 1
+
+
+def instrument(func: Callable) -> Callable:
+    name = f"{func.__module__}.{func.__qualname__}"
+
+    @wraps(func)
+    def wrapper(*args, **kwargs) -> Any:
+        if not registry.enabled:
+            return func(*args, **kwargs)
+
+        started = time.perf_counter()
+        with counting_queries() as counter:
+            returned = func(*args, **kwargs)
+        registry.record(
+            name,
+            time.perf_counter() - started,
+            counter.count,
+            count_rows(returned),
+        )
+        if (
+            isinstance(returned, QuerySet)
+            and returned._result_cache is None
+        ):
+            return instrument_queryset(returned, name)
+        return returned
+
+    return wrapper
+
+
+@contextmanager
+def instrumentation_enabled() -> Iterator[InstrumentationRegistry]:
+    previous = registry.enabled
+    registry.enable()
+    try:
+        yield registry
+    finally:
+        registry.enabled = previous
@@ -1,41 +1,119 @@
 from django.db import transaction
-from django.db.models import QuerySet
+from django.db.models import Count, QuerySet
 
-from db.models import Movie
+from db.models import DEFAULT_MOVIE_DURATION, Movie
+from services.catalog_cache import catalog_cache, load_movie, movie_key
+from services.instrumentation import instrument
+from services.replicas import read_replica
+from services.movie_search import (
+    DEFAULT_FUZZY_THRESHOLD,
+    get_movie_search_index,
+)
 
 
+SEARCH_BATCH_SIZE = 500
+FILTER_MODES = ("any", "all")
+
+
+def filter_by_membership(
+    queryset: QuerySet[Movie],
+    relation: str,
+    related_ids: list[int],
+    mode: str = "any",
+) -> QuerySet[Movie]:
+    if mode not in FILTER_MODES:
+        raise ValueError(f"filter mode must be one of {FILTER_MODES}")
+    related_field = getattr(Movie, relation).field.m2m_reverse_field_name()
+    related_ids = set(related_ids)
+    members = getattr(Movie, relation).through.objects.filter(
+        **{f"{related_field}__in": related_ids}
+    ).order_by().values("movie_id")
+    if mode == "all":
+        members = members.annotate(matched=Count("pk")).filter(
+            matched=len(related_ids)
+        )
+    return queryset.filter(id__in=members.values("movie_id"))
+
+
+@instrument
+@read_replica
 def get_movies(
     genres_ids: list[int] = None,
     actors_ids: list[int] = None,
-    title: str = None
-) -> QuerySet:
+    title: str = None,
+    genres_mode: str = "any",
+    actors_mode: str = "any",
+) -> QuerySet[Movie]:
+    queryset = Movie.objects.prefetch_related(
+        "genres", "actors"
+    ).order_by("id")
+
     if title:
-        return Movie.objects.filter(title__contains=title)
-    queryset = Movie.objects.all()
+        queryset = queryset.filter(title__icontains=title)
 
     if genres_ids:
-        queryset = queryset.filter(genres__id__in=genres_ids)
+        queryset = filter_by_membership(
+            queryset, "genres", genres_ids, genres_mode
+        )
 
     if actors_ids:
-        queryset = queryset.filter(actors__id__in=actors_ids)
+        queryset = filter_by_membership(
+            queryset, "actors", actors_ids, actors_mode
+        )
 
     return queryset
 
 
+@instrument
+@read_replica
+def search_movies(
+    query: str,
+    genres_ids: list[int] = None,
+    actors_ids: list[int] = None,
+    mode: str = "contains",
+    limit: int = 20,
+    threshold: float = DEFAULT_FUZZY_THRESHOLD,
+    genres_mode: str = "any",
+    actors_mode: str = "any",
+) -> list[Movie]:
+    ranked_ids = get_movie_search_index().search(query, mode, threshold)
+    movies = []
+    for start in range(0, len(ranked_ids), SEARCH_BATCH_SIZE):
+        batch = ranked_ids[start:start + SEARCH_BATCH_SIZE]
+        found = get_movies(
+            genres_ids,
+            actors_ids,
+            genres_mode=genres_mode,
+            actors_mode=actors_mode,
+        ).in_bulk(batch)
+        movies.extend(
+            found[movie_id] for movie_id in batch if movie_id in found
+        )
+        if len(movies) >= limit:
+            break
+    return movies[:limit]
+
+
+@instrument
 def get_movie_by_id(movie_id: int) -> Movie:
-    return Movie.objects.get(id=movie_id)
+    return catalog_cache.get_or_load(
+        movie_key(movie_id), lambda: load_movie(movie_id)
+    )
 
 
+@instrument
 def create_movie(
     movie_title: str,
     movie_description: str,
     genres_ids: list = None,
     actors_ids: list = None,
+    duration: int = DEFAULT_MOVIE_DURATION,
 ) -> Movie:
     with transaction.atomic():
         movie = Movie.objects.create(
             title=movie_title,
             description=movie_description,
+            duration=duration,
         )
         if genres_ids:
             movie.genres.set(genres_ids)
@@ -0,0 +1,186 @@
+import datetime
+import threading
+from collections import Counter, defaultdict
+from typing import Iterable
+
+from db.models import Movie
+from services.replicas import use_primary
+
+
+SEARCH_MODES = ("contains", "prefix", "fuzzy")
+DEFAULT_FUZZY_THRESHOLD = 0.3
+
+
+def normalize(text: str) -> str:
+    return " ".join(text.lower().split())
+
+
+def trigrams(text: str, padded: bool = True) -> set[str]:
+    text = normalize(text)
+    if padded:
+        text = f"  {text} "
+    return {text[index:index + 3] for index in range(len(text) - 2)}
+
+
+class TrigramIndex:
+    def __init__(self) -> None:
+        self.loaded = False
+        self.version = None
+        self._titles = {}
+        self._trigrams = {}
+        self._postings = defaultdict(set)
+        self._lock = threading.RLock()
+
+    def __len__(self) -> int:
+        return len(self._titles)
+
+    def clear(self) -> None:
+        with self._lock:
+            self.loaded = False
+            self.version = None
+            self._titles.clear()
+            self._trigrams.clear()
+            self._postings.clear()
+
+    def load(
+            self,
+            titles: Iterable[tuple[int, str]],
+            version: datetime.datetime = None
+    ) -> None:
+        with self._lock:
+            self.clear()
+            for movie_id, title in titles:
+                self.add(movie_id, title)
+            self.loaded = True
+            self.version = version
+
+    def add(self, movie_id: int, title: str) -> None:
+        with self._lock:
+            self.remove(movie_id)
+            title_trigrams = trigrams(title)
+            self._titles[movie_id] = normalize(title)
+            self._trigrams[movie_id] = title_trigrams
+            for trigram in title_trigrams:
+                self._postings[trigram].add(movie_id)
+
+    def remove(self, movie_id: int) -> None:
+        with self._lock:
+            self._titles.pop(movie_id, None)
+            for trigram in self._trigrams.pop(movie_id, ()):
+                postings = self._postings[trigram]
+                postings.discard(movie_id)
+                if not postings:
+                    del self._postings[trigram]
+
+    def _intersect(self, query_trigrams: set[str]) -> set[int]:
+        postings = sorted(
+            (self._postings.get(trigram, set()) for trigram in query_trigrams),
+            key=len,
+        )
+        if not postings:
+            return set(self._titles)
+        candidates = set(postings[0])
+        for posting in postings[1:]:
+            candidates &= posting
+            if not candidates:
+                break
+        return candidates
+
+    def containing(self, query: str) -> set[int] | None:
+        query = normalize(query)
+        if len(query) < 3:
+            return None
+        with self._lock:
+            return {
+                movie_id
+                for movie_id in self._intersect(trigrams(query, False))
+                if query in self._titles[movie_id]
+            }
+
+    def with_prefix(self, query: str) -> set[int]:
+        query = normalize(query)
+        with self._lock:
+            return {
+                movie_id
+                for movie_id in self._intersect(trigrams(f" {query}", False))
+                if f" {query}" in f" {self._titles[movie_id]}"
+            }
+
+    def similarity(self, movie_id: int, query_trigrams: set[str]) -> float:
+        title_trigrams = self._trigrams[movie_id]
+        shared = len(title_trigrams & query_trigrams)
+        return shared / (len(title_trigrams) + len(query_trigrams) - shared)
+
+    def similar(
+            self,
+            query: str,
+            threshold: float = DEFAULT_FUZZY_THRESHOLD
+    ) -> dict[int, float]:
+        query_trigrams = trigrams(query)
+        with self._lock:
+            shared = Counter()
+            for trigram in query_trigrams:
+                shared.update(self._postings.get(trigram, ()))
+            scores = {}
+            for movie_id, count in shared.items():
+                score = count / (
+                    len(self._trigrams[movie_id]) + len(query_trigrams) - count
+                )
+                if score >= threshold:
+                    scores[movie_id] = score
+            return scores
+
+    def search(
+            self,
+            query: str,
+            mode: str = "contains",
+            threshold: float = DEFAULT_FUZZY_THRESHOLD
+    ) -> list[int]:
+        if mode not in SEARCH_MODES:
+            raise ValueError(f"search mode must be one of {SEARCH_MODES}")
+        if mode == "fuzzy":
+            scores = self.similar(query, threshold)
+        else:
+            if mode == "prefix":
+                matches = self.with_prefix(query)
+            else:
+                matches = self.containing(query)
+                if matches is None:
+                    matches = self.with_prefix(query)
+            query_trigrams = trigrams(query)
+            with self._lock:
+                scores = {
+                    movie_id: self.similarity(movie_id, query_trigrams)
+                    for movie_id in matches
+                }
+        with self._lock:
+            return sorted(
+                scores,
+                key=lambda movie_id: (
+                    -scores[movie_id], self._titles.get(movie_id, ""), movie_id
+                ),
+            )
+
+
+movie_search_index = TrigramIndex()
+
+
+def movie_titles_version() -> datetime.datetime | None:
+    return Movie.objects.order_by("-updated_at").values_list(
+        "updated_at", flat=True
+    ).first()
+
+
+def get_movie_search_index() -> TrigramIndex:
+    with use_primary():
+        version = movie_titles_version()
+        if not movie_search_index.loaded or (
+            movie_search_index.version != version
+        ):
+            movie_search_index.load(
+                Movie.objects.values_list("id", "title").iterator(
+                    chunk_size=5000
+                ),
+                version,
+            )
+    return movie_search_index
@@ -1,49 +1,207 @@
+import datetime
+from collections import defaultdict
+
+from django.conf import settings
+from django.core.exceptions import ValidationError
 from django.db.models import QuerySet
+from django.utils import timezone
+from django.utils.dateparse import parse_date
+
+from db.models import CinemaHall, MovieSession
+from services.hall_schedule import hall_schedule_lock, validate_schedule
+from services.instrumentation import instrument
+from services.replicas import read_replica
+from services.seat_map import SeatMap, seat_map_cache
+from services.updates import partial_update, supplied_fields
 
-from db.models import MovieSession, Ticket
 
+RECOMMENDATION_LIMIT = 5
 
+
+@instrument
 def create_movie_session(
     movie_show_time: str, movie_id: int, cinema_hall_id: int
 ) -> MovieSession:
-    return MovieSession.objects.create(
+    movie_session = MovieSession(
         show_time=movie_show_time,
         movie_id=movie_id,
         cinema_hall_id=cinema_hall_id,
     )
+    with hall_schedule_lock([cinema_hall_id]):
+        validate_schedule([movie_session])
+        movie_session.save()
+    return movie_session
+
+
+def to_date(value: str | datetime.date) -> datetime.date:
+    if isinstance(value, datetime.datetime):
+        return value.date()
+    if isinstance(value, datetime.date):
+        return value
+    parsed = parse_date(value)
+    if parsed is None:
+        raise ValueError(f"invalid date: {value!r}")
+    return parsed
+
+
+def date_range(
+    start_date: str | datetime.date,
+    end_date: str | datetime.date = None,
+) -> tuple[datetime.date, datetime.date]:
+    start_date = to_date(start_date)
+    end_date = to_date(end_date) if end_date else start_date
+    if end_date < start_date:
+        raise ValueError("end date must not be before start date")
+    return start_date, end_date
+
+
+def day_bounds(
+    start_date: str | datetime.date,
+    end_date: str | datetime.date = None,
+) -> tuple[datetime.datetime, datetime.datetime]:
+    start_date, end_date = date_range(start_date, end_date)
+    start = datetime.datetime.combine(start_date, datetime.time.min)
+    end = datetime.datetime.combine(
+        end_date + datetime.timedelta(days=1), datetime.time.min
+    )
+    if settings.USE_TZ:
+        start, end = timezone.make_aware(start), timezone.make_aware(end)
+    return start, end
 
 
-def get_movies_sessions(session_date: str = None) -> QuerySet:
-    queryset = MovieSession.objects.all()
+@instrument
+@read_replica
+def get_movies_sessions(session_date: str = None) -> QuerySet[MovieSession]:
+    queryset = MovieSession.objects.select_related("movie", "cinema_hall")
     if session_date:
-        queryset = queryset.filter(show_time__date=session_date)
+        start, end = day_bounds(session_date)
+        queryset = queryset.filter(show_time__gte=start, show_time__lt=end)
     return queryset
 
 
+@instrument
+@read_replica
+def get_schedule(
+    start_date: str | datetime.date,
+    end_date: str | datetime.date = None,
+    cinema_hall_ids: list[int] = None,
+    movie_ids: list[int] = None,
+) -> dict[datetime.date, dict[CinemaHall, list[MovieSession]]]:
+    start, end = day_bounds(start_date, end_date)
+    queryset = MovieSession.objects.select_related(
+        "movie", "cinema_hall"
+    ).filter(show_time__gte=start, show_time__lt=end)
+    if cinema_hall_ids:
+        queryset = queryset.filter(cinema_hall_id__in=cinema_hall_ids)
+    if movie_ids:
+        queryset = queryset.filter(movie_id__in=movie_ids)
+
+    schedule = defaultdict(lambda: defaultdict(list))
+    for movie_session in queryset.order_by("show_time", "id"):
+        show_time = movie_session.show_time
+        if settings.USE_TZ:
+            show_time = timezone.localtime(show_time)
+        day = schedule[show_time.date()]
+        day[movie_session.cinema_hall].append(movie_session)
+    return {
+        day: dict(sorted(halls.items(), key=lambda item: item[0].id))
+        for day, halls in schedule.items()
+    }
+
+
+@instrument
 def get_movie_session_by_id(movie_session_id: int) -> MovieSession:
     return MovieSession.objects.get(id=movie_session_id)
 
 
+@instrument
 def update_movie_session(
     session_id: int,
     show_time: str = None,
     movie_id: int = None,
     cinema_hall_id: int = None,
-) -> None:
-    movie_session = MovieSession.objects.get(id=session_id)
-    if show_time:
-        movie_session.show_time = show_time
-    if movie_id:
-        movie_session.movie_id = movie_id
-    if cinema_hall_id:
-        movie_session.cinema_hall_id = cinema_hall_id
-    movie_session.save()
+) -> bool:
+    hall_ids = [cinema_hall_id] if cinema_hall_id else (
+        MovieSession.objects.filter(id=session_id).values_list(
+            "cinema_hall_id", flat=True
+        )
+    )
+    with hall_schedule_lock(hall_ids):
+        return partial_update(
+            MovieSession,
+            session_id,
+            supplied_fields(
+                show_time=show_time,
+                movie_id=movie_id,
+                cinema_hall_id=cinema_hall_id,
+            ),
+            before_save=lambda movie_session: validate_schedule(
+                [movie_session]
+            ),
+            load=("show_time", "movie_id", "cinema_hall_id"),
+        )
 
 
+@instrument
 def delete_movie_session_by_id(session_id: int) -> None:
     MovieSession.objects.get(id=session_id).delete()
 
 
+def _cached_seat_map(movie_session_id: int) -> SeatMap:
+    seat_map = seat_map_cache.get(movie_session_id)
+    if seat_map is None:
+        raise MovieSession.DoesNotExist(
+            f"movie session with id {movie_session_id} does not exist"
+        )
+    return seat_map
+
+
+@instrument
+def free_seat_count(movie_session_id: int) -> int:
+    return _cached_seat_map(movie_session_id).free_count()
+
+
+@instrument
+def is_seat_free(movie_session_id: int, row: int, seat: int) -> bool:
+    seat_map = _cached_seat_map(movie_session_id)
+    return seat_map.contains(row, seat) and not seat_map.is_taken(row, seat)
+
+
+@instrument
+def find_adjacent_free_seats(
+    movie_session_id: int, seats_count: int
+) -> list[dict]:
+    return _cached_seat_map(movie_session_id).find_adjacent_free_seats(
+        seats_count
+    )
+
+
+def validate_recommendation(seats_count: int, limit: int) -> None:
+    errors = {}
+    if seats_count < 1:
+        errors["seats_count"] = ["seats count must be at least 1"]
+    if limit < 1:
+        errors["limit"] = ["limit must be at least 1"]
+    if errors:
+        raise ValidationError(errors)
+
+
+@instrument
+def recommend_seats(
+    movie_session_id: int,
+    seats_count: int,
+    limit: int = RECOMMENDATION_LIMIT,
+) -> list[dict]:
+    validate_recommendation(seats_count, limit)
+    return _cached_seat_map(movie_session_id).best_free_blocks(
+        seats_count, limit
+    )
+
+
+@instrument
+@read_replica
 def get_taken_seats(movie_session_id: int) -> list:
-    tickets = Ticket.objects.filter(movie_session_id=movie_session_id)
-    return [{"row": ticket.row, "seat": ticket.seat} for ticket in tickets]
+    seat_map = seat_map_cache.get(movie_session_id)
+    if seat_map is None:
+        return []
+    return seat_map.taken_seats()
@@ -0,0 +1,118 @@
+from collections import Counter
+from contextvars import ContextVar
+from typing import Iterable
+
+from django.db.models import (
+    Case,
+    Count,
+    F,
+    OuterRef,
+    Q,
+    Subquery,
+    Value,
+    When,
+)
+from django.db.models.functions import Greatest
+
+from db.models import CinemaHall, MovieSession, Ticket
+
+
+RECONCILE_BATCH_SIZE = 1000
+DELETED_TICKETS_BATCH_SIZE = 500
+
+_deleted_tickets = ContextVar("deleted_tickets", default=None)
+
+
+def _hall_capacity() -> Subquery:
+    return Subquery(
+        CinemaHall.objects.filter(
+            id=OuterRef("cinema_hall_id")
+        ).annotate(
+            capacity=F("rows") * F("seats_in_row")
+        ).values("capacity")[:1]
+    )
+
+
+def adjust_sold_count(movie_session_id: int, delta: int) -> int:
+    sold_count = Greatest(F("sold_count") + delta, Value(0))
+    return MovieSession.objects.filter(id=movie_session_id).update(
+        sold_count=sold_count,
+        is_sold_out=Case(
+            When(Q(sold_count__gte=_hall_capacity() - delta), then=True),
+            default=False,
+        ),
+    )
+
+
+def adjust_sold_counts(deltas: dict[int, int]) -> None:
+    for movie_session_id, delta in sorted(deltas.items()):
+        if delta:
+            adjust_sold_count(movie_session_id, delta)
+
+
+def track_deleted_ticket(ticket: Ticket) -> None:
+    pending = _deleted_tickets.get()
+    if pending is None:
+        pending = {}
+        _deleted_tickets.set(pending)
+    pending[ticket.pk] = ticket.movie_session_id
+
+
+def pop_deleted_tickets() -> Counter:
+    pending = _deleted_tickets.get()
+    if not pending:
+        return Counter()
+    _deleted_tickets.set(None)
+    ticket_ids = list(pending)
+    remaining = set()
+    for start in range(0, len(ticket_ids), DELETED_TICKETS_BATCH_SIZE):
+        remaining.update(Ticket.objects.filter(
+            id__in=ticket_ids[start:start + DELETED_TICKETS_BATCH_SIZE]
+        ).values_list("id", flat=True))
+    return Counter(
+        movie_session_id
+        for ticket_id, movie_session_id in pending.items()
+        if ticket_id not in remaining
+    )
+
+
+def reconcile_occupancy(
+        session_ids: Iterable[int] = None,
+        fix: bool = True,
+        batch_size: int = RECONCILE_BATCH_SIZE
+) -> list[dict]:
+    queryset = MovieSession.objects.all()
+    if session_ids is not None:
+        queryset = queryset.filter(id__in=session_ids)
+    sessions = queryset.annotate(
+        actual=Count("tickets"),
+        capacity=F("cinema_hall__rows") * F("cinema_hall__seats_in_row"),
+    ).order_by("id").values_list(
+        "id", "sold_count", "is_sold_out", "actual", "capacity"
+    )
+
+    drift = []
+    for session_id, sold_count, is_sold_out, actual, capacity in sessions:
+        sold_out = actual >= capacity
+        if sold_count != actual or is_sold_out != sold_out:
+            drift.append({
+                "movie_session": session_id,
+                "sold_count": sold_count,
+                "actual": actual,
+                "is_sold_out": sold_out,
+            })
+
+    if fix and drift:
+        MovieSession.objects.bulk_update(
+            [
+                MovieSession(
+                    id=report["movie_session"],
+                    sold_count=report["actual"],
+                    is_sold_out=report["is_sold_out"],
+                )
+                for report in drift
+            ],
+            ["sold_count", "is_sold_out"],
+            batch_size=batch_size,
+        )
+    return drift
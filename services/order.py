@@ -1,33 +1,95 @@
 from datetime import datetime
 
 from django.db import transaction
-from django.db.models import QuerySet
+from django.db.models import Count, Prefetch, QuerySet, Sum
 
 from db.models import Order, Ticket, User
+from services.booking import (
+    book_tickets,
+    booking_session_ids,
+    local_session_locks,
+)
+from services.instrumentation import instrument
+from services.pagination import after_cursor, encode_cursor
+from services.replicas import read_replica
 
 
+ORDER_HISTORY_PAGE_SIZE = 20
+
+
+@instrument
 def create_order(
         tickets: list,
         username: str,
-        date: str = None
-) -> None:
-    with transaction.atomic():
-        order = Order(
-            user=User.objects.get(username=username)
+        date: str = None,
+        replace_taken: bool = False,
+        hold_token: str = None
+) -> Order:
+    with local_session_locks(booking_session_ids(tickets, hold_token)):
+        return _save_order(
+            tickets, username, date, replace_taken, hold_token
         )
-        if date:
-            order.created_at = datetime.strptime(date, "%Y-%m-%d %H:%M")
-        order.save()
-        for ticket in tickets:
-            Ticket.objects.create(
-                movie_session_id=ticket["movie_session"],
-                seat=ticket["seat"],
-                row=ticket["row"],
-                order=order
-            )
-
-
-def get_orders(username: str = None) -> QuerySet:
+
+
+@transaction.atomic
+def _save_order(
+        tickets: list,
+        username: str,
+        date: str = None,
+        replace_taken: bool = False,
+        hold_token: str = None
+) -> Order:
+    order = Order(
+        user=User.objects.get(username=username)
+    )
+    if date:
+        order.created_at = datetime.strptime(date, "%Y-%m-%d %H:%M")
+    order.save()
+    book_tickets(order, tickets, replace_taken, hold_token)
+    return order
+
+
+@instrument
+@read_replica
+def get_tickets_for_order(order_id: int) -> QuerySet[Ticket]:
+    return Ticket.objects.filter(order_id=order_id).select_related(
+        "movie_session__movie"
+    )
+
+
+@instrument
+@read_replica
+def get_orders(username: str = None) -> QuerySet[Order]:
+    queryset = Order.objects.select_related("user").prefetch_related(
+        Prefetch(
+            "tickets",
+            queryset=Ticket.objects.select_related("movie_session__movie"),
+        )
+    )
     if username:
-        return Order.objects.filter(user__username=username)
-    return Order.objects.all()
+        queryset = queryset.filter(user__username=username)
+    return queryset
+
+
+@instrument
+@read_replica
+def get_order_history(
+        username: str,
+        cursor: str = None,
+        page_size: int = ORDER_HISTORY_PAGE_SIZE,
+        with_totals: bool = False
+) -> dict:
+    queryset = after_cursor(
+        Order.objects.filter(user__username=username), cursor, descending=True
+    )
+    if with_totals:
+        queryset = queryset.annotate(
+            tickets_count=Count("tickets"),
+            total=Sum("tickets__movie_session__price", default=0),
+        )
+    orders = list(queryset[:page_size + 1])
+    next_cursor = None
+    if len(orders) > page_size:
+        orders = orders[:page_size]
+        next_cursor = encode_cursor(orders[-1].created_at, orders[-1].id)
+    return {"orders": orders, "next_cursor": next_cursor}
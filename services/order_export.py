@@ -0,0 +1,135 @@
+import csv
+import json
+from collections import defaultdict
+from datetime import datetime
+from typing import Iterator, TextIO
+
+from db.models import Order, Ticket
+from services.pagination import after_cursor, encode_cursor
+
+
+DEFAULT_PAGE_SIZE = 1000
+TICKETS_CHUNK_SIZE = 2000
+EXPORT_FORMATS = ("jsonl", "csv")
+CSV_COLUMNS = (
+    "order_id",
+    "created_at",
+    "username",
+    "ticket_id",
+    "row",
+    "seat",
+    "movie_session_id",
+    "show_time",
+    "movie",
+    "cinema_hall",
+)
+
+
+def iter_order_pages(
+        start: datetime = None,
+        end: datetime = None,
+        username: str = None,
+        cursor: str = None,
+        page_size: int = DEFAULT_PAGE_SIZE
+) -> Iterator[list[dict]]:
+    queryset = Order.objects.all()
+    if start:
+        queryset = queryset.filter(created_at__gte=start)
+    if end:
+        queryset = queryset.filter(created_at__lt=end)
+    if username:
+        queryset = queryset.filter(user__username=username)
+
+    while True:
+        orders = list(
+            after_cursor(queryset, cursor).values(
+                "id", "created_at", "user__username"
+            )[:page_size]
+        )
+        if not orders:
+            return
+
+        tickets = defaultdict(list)
+        ticket_rows = Ticket.objects.filter(
+            order_id__in=[order["id"] for order in orders]
+        ).order_by("id").values(
+            "id",
+            "order_id",
+            "row",
+            "seat",
+            "movie_session_id",
+            "movie_session__show_time",
+            "movie_session__movie__title",
+            "movie_session__cinema_hall__name",
+        ).iterator(chunk_size=TICKETS_CHUNK_SIZE)
+        for ticket in ticket_rows:
+            tickets[ticket["order_id"]].append({
+                "id": ticket["id"],
+                "row": ticket["row"],
+                "seat": ticket["seat"],
+                "movie_session_id": ticket["movie_session_id"],
+                "show_time": ticket["movie_session__show_time"].isoformat(),
+                "movie": ticket["movie_session__movie__title"],
+                "cinema_hall": ticket["movie_session__cinema_hall__name"],
+            })
+
+        page = []
+        for order in orders:
+            cursor = encode_cursor(order["created_at"], order["id"])
+            page.append({
+                "id": order["id"],
+                "created_at": order["created_at"].isoformat(),
+                "username": order["user__username"],
+                "tickets": tickets.pop(order["id"], []),
+                "cursor": cursor,
+            })
+        yield page
+
+
+def write_jsonl(output: TextIO, page: list[dict]) -> None:
+    for order in page:
+        output.write(json.dumps(order) + "\n")
+
+
+def write_csv(writer: csv.writer, page: list[dict]) -> None:
+    for order in page:
+        order_columns = [order["id"], order["created_at"], order["username"]]
+        if not order["tickets"]:
+            writer.writerow(order_columns + [""] * 7)
+        for ticket in order["tickets"]:
+            writer.writerow(order_columns + [
+                ticket["id"],
+                ticket["row"],
+                ticket["seat"],
+                ticket["movie_session_id"],
+                ticket["show_time"],
+                ticket["movie"],
+                ticket["cinema_hall"],
+            ])
+
+
+def export_orders(
+        output: TextIO,
+        export_format: str = "jsonl",
+        start: datetime = None,
+        end: datetime = None,
+        username: str = None,
+        cursor: str = None,
+        page_size: int = DEFAULT_PAGE_SIZE
+) -> str | None:
+    if export_format not in EXPORT_FORMATS:
+        raise ValueError(f"export format must be one of {EXPORT_FORMATS}")
+
+    writer = None
+    if export_format == "csv":
+        writer = csv.writer(output)
+        if not cursor:
+            writer.writerow(CSV_COLUMNS)
+
+    for page in iter_order_pages(start, end, username, cursor, page_size):
+        if writer:
+            write_csv(writer, page)
+        else:
+            write_jsonl(output, page)
+        cursor = page[-1]["cursor"]
+    return cursor
@@ -0,0 +1,40 @@
+from datetime import datetime
+
+from django.db.models import Q, QuerySet
+
+
+CURSOR_SEPARATOR = "|"
+
+
+def encode_cursor(created_at: datetime, pk: int) -> str:
+    return f"{created_at.isoformat()}{CURSOR_SEPARATOR}{pk}"
+
+
+def decode_cursor(cursor: str) -> tuple[datetime, int]:
+    try:
+        created_at, pk = cursor.rsplit(CURSOR_SEPARATOR, 1)
+        return datetime.fromisoformat(created_at), int(pk)
+    except ValueError:
+        raise ValueError(f"invalid pagination cursor: {cursor!r}")
+
+
+def after_cursor(
+    queryset: QuerySet,
+    cursor: str = None,
+    descending: bool = False,
+) -> QuerySet:
+    if descending:
+        queryset = queryset.order_by("-created_at", "-id")
+    else:
+        queryset = queryset.order_by("created_at", "id")
+    if not cursor:
+        return queryset
+
+    created_at, pk = decode_cursor(cursor)
+    if descending:
+        return queryset.filter(
+            Q(created_at__lt=created_at) | Q(created_at=created_at, id__lt=pk)
+        )
+    return queryset.filter(
+        Q(created_at__gt=created_at) | Q(created_at=created_at, id__gt=pk)
+    )
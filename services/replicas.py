@@ -0,0 +1,111 @@
+import functools
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import Context, ContextVar
+from typing import Any, Callable, Iterator
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, connections
+from django.db.models import QuerySet
+
+
+_read_alias = ContextVar("read_alias", default=None)
+_primary_only = ContextVar("primary_only", default=False)
+_last_write_at = ContextVar("last_write_at", default=None)
+
+
+class ReplicaSelector:
+    def __init__(self, weights: dict[str, int] = None) -> None:
+        self.weights = {
+            alias: weight for alias, weight in (weights or {}).items()
+            if weight > 0
+        }
+        self._total = sum(self.weights.values())
+        self._current = dict.fromkeys(self.weights, 0)
+        self._lock = threading.Lock()
+
+    def __bool__(self) -> bool:
+        return bool(self.weights)
+
+    def next(self) -> str:
+        with self._lock:
+            for alias, weight in self.weights.items():
+                self._current[alias] += weight
+            alias = max(self._current, key=self._current.get)
+            self._current[alias] -= self._total
+            return alias
+
+
+replica_selector = ReplicaSelector(getattr(settings, "DATABASE_REPLICAS", {}))
+
+
+def configure_replicas(weights: dict[str, int]) -> None:
+    global replica_selector
+    replica_selector = ReplicaSelector(weights)
+
+
+def read_after_write_window() -> float:
+    return getattr(settings, "REPLICA_READ_AFTER_WRITE_SECONDS", 1.0)
+
+
+def mark_write() -> None:
+    _last_write_at.set(time.monotonic())
+
+
+def adopt_write_marker(context: Context) -> None:
+    last_write_at = context.get(_last_write_at)
+    if last_write_at is not None and last_write_at != _last_write_at.get():
+        _last_write_at.set(last_write_at)
+
+
+def wrote_recently() -> bool:
+    last_write_at = _last_write_at.get()
+    return (
+        last_write_at is not None
+        and time.monotonic() - last_write_at < read_after_write_window()
+    )
+
+
+def current_read_alias() -> str | None:
+    return _read_alias.get()
+
+
+def choose_read_alias() -> str | None:
+    if (
+        not replica_selector
+        or _primary_only.get()
+        or connections[DEFAULT_DB_ALIAS].in_atomic_block
+        or wrote_recently()
+    ):
+        return None
+    return _read_alias.get() or replica_selector.next()
+
+
+@contextmanager
+def use_primary() -> Iterator[None]:
+    primary_token = _primary_only.set(True)
+    alias_token = _read_alias.set(None)
+    try:
+        yield
+    finally:
+        _read_alias.reset(alias_token)
+        _primary_only.reset(primary_token)
+
+
+def read_replica(func: Callable) -> Callable:
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs) -> Any:
+        alias = choose_read_alias()
+        if alias is None:
+            return func(*args, **kwargs)
+        token = _read_alias.set(alias)
+        try:
+            result = func(*args, **kwargs)
+        finally:
+            _read_alias.reset(token)
+        if isinstance(result, QuerySet):
+            return result.using(alias)
+        return result
+
+    return wrapper
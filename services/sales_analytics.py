@@ -0,0 +1,128 @@
+import datetime
+from decimal import Decimal
+
+from django.db.models import Count, QuerySet, Sum
+
+from db.models import CinemaHall, MovieSession, SalesRollup
+from services.instrumentation import instrument
+from services.movie_session import date_range, day_bounds
+from services.replicas import read_replica
+
+
+TOP_MOVIES_ORDERING = {"tickets": "-tickets", "revenue": "-sales"}
+
+
+def sales_in_range(
+        start_date: str | datetime.date,
+        end_date: str | datetime.date = None,
+        movie_ids: list[int] = None,
+        cinema_hall_ids: list[int] = None
+) -> QuerySet[SalesRollup]:
+    queryset = SalesRollup.objects.filter(
+        date__range=date_range(start_date, end_date)
+    )
+    if movie_ids:
+        queryset = queryset.filter(movie_id__in=movie_ids)
+    if cinema_hall_ids:
+        queryset = queryset.filter(cinema_hall_id__in=cinema_hall_ids)
+    return queryset
+
+
+@instrument
+@read_replica
+def get_top_movies(
+        start_date: str | datetime.date,
+        end_date: str | datetime.date = None,
+        limit: int = 10,
+        order_by: str = "tickets",
+        cinema_hall_ids: list[int] = None
+) -> list[dict]:
+    if order_by not in TOP_MOVIES_ORDERING:
+        raise ValueError(f"unknown top movies ordering {order_by}")
+    movies = sales_in_range(
+        start_date, end_date, cinema_hall_ids=cinema_hall_ids
+    ).values("movie_id", "movie__title").annotate(
+        tickets=Sum("tickets_sold"), sales=Sum("revenue")
+    ).order_by(TOP_MOVIES_ORDERING[order_by], "movie_id")[:limit]
+    return [
+        {
+            "movie": movie["movie_id"],
+            "title": movie["movie__title"],
+            "tickets": movie["tickets"],
+            "revenue": movie["sales"],
+        }
+        for movie in movies
+    ]
+
+
+@instrument
+@read_replica
+def get_hall_utilization(
+        start_date: str | datetime.date,
+        end_date: str | datetime.date = None,
+        cinema_hall_ids: list[int] = None
+) -> list[dict]:
+    start, end = day_bounds(start_date, end_date)
+    halls = CinemaHall.objects.order_by("id")
+    sessions = MovieSession.objects.filter(
+        show_time__gte=start, show_time__lt=end
+    )
+    if cinema_hall_ids:
+        halls = halls.filter(id__in=cinema_hall_ids)
+        sessions = sessions.filter(cinema_hall_id__in=cinema_hall_ids)
+    session_counts = dict(
+        sessions.values("cinema_hall_id").annotate(
+            sessions=Count("id")
+        ).values_list("cinema_hall_id", "sessions").order_by()
+    )
+    sold = dict(
+        sales_in_range(
+            start_date, end_date, cinema_hall_ids=cinema_hall_ids
+        ).values("cinema_hall_id").annotate(
+            tickets=Sum("tickets_sold")
+        ).values_list("cinema_hall_id", "tickets").order_by()
+    )
+
+    utilization = []
+    for hall in halls:
+        hall_sessions = session_counts.get(hall.id, 0)
+        seats = hall_sessions * hall.capacity
+        tickets = sold.get(hall.id, 0)
+        utilization.append({
+            "cinema_hall": hall.id,
+            "name": hall.name,
+            "sessions": hall_sessions,
+            "seats": seats,
+            "tickets": tickets,
+            "utilization": tickets / seats if seats else 0.0,
+        })
+    return utilization
+
+
+@instrument
+@read_replica
+def get_sales_time_series(
+        start_date: str | datetime.date,
+        end_date: str | datetime.date = None,
+        movie_ids: list[int] = None,
+        cinema_hall_ids: list[int] = None
+) -> list[dict]:
+    start_date, end_date = date_range(start_date, end_date)
+    totals = {
+        day["date"]: day
+        for day in sales_in_range(
+            start_date, end_date, movie_ids, cinema_hall_ids
+        ).values("date").annotate(
+            tickets=Sum("tickets_sold"), sales=Sum("revenue")
+        ).order_by("date")
+    }
+    series = []
+    for offset in range((end_date - start_date).days + 1):
+        day = start_date + datetime.timedelta(days=offset)
+        total = totals.get(day, {})
+        series.append({
+            "date": day,
+            "tickets": total.get("tickets", 0),
+            "revenue": total.get("sales", Decimal(0)),
+        })
+    return series
@@ -0,0 +1,134 @@
+import datetime
+from collections import defaultdict
+from decimal import Decimal
+from itertools import islice
+from typing import Iterable
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.db.models import Count, F, Sum, Value
+from django.db.models.functions import Greatest, TruncDate
+from django.utils import timezone
+
+from db.models import MovieSession, SalesRollup, Ticket
+from services.movie_session import date_range, day_bounds
+
+
+ROLLUP_BATCH_SIZE = 1000
+
+
+def show_date(show_time: datetime.datetime) -> datetime.date:
+    if settings.USE_TZ:
+        show_time = timezone.localtime(show_time)
+    return show_time.date()
+
+
+def _upsert_sales(sales: dict[tuple, list]) -> None:
+    table = connection.ops.quote_name(SalesRollup._meta.db_table)
+    rows = sorted(sales.items())
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"INSERT INTO {table} "
+            f"(date, movie_id, cinema_hall_id, tickets_sold, revenue) "
+            f"VALUES {', '.join(['(%s, %s, %s, %s, %s)'] * len(rows))} "
+            f"ON CONFLICT (date, movie_id, cinema_hall_id) DO UPDATE SET "
+            f"tickets_sold = {table}.tickets_sold + excluded.tickets_sold, "
+            f"revenue = {table}.revenue + excluded.revenue",
+            [
+                value
+                for (date, movie_id, hall_id), (tickets, revenue) in rows
+                for value in (
+                    connection.ops.adapt_datefield_value(date),
+                    movie_id,
+                    hall_id,
+                    tickets,
+                    connection.ops.adapt_decimalfield_value(revenue),
+                )
+            ],
+        )
+
+
+def adjust_sales(
+        deltas: dict[int, int],
+        sessions: Iterable[MovieSession] = None
+) -> None:
+    if sessions is None:
+        sessions = MovieSession.objects.filter(
+            id__in=[session_id for session_id, delta in deltas.items()
+                    if delta]
+        ).only("show_time", "movie_id", "cinema_hall_id", "price")
+    keyed = defaultdict(lambda: [0, Decimal(0)])
+    for session in sessions:
+        delta = deltas.get(session.id)
+        if delta:
+            totals = keyed[(show_date(session.show_time), session.movie_id,
+                            session.cinema_hall_id)]
+            totals[0] += delta
+            totals[1] += delta * session.price
+
+    gains = {key: totals for key, totals in keyed.items() if totals[0] > 0}
+    if gains:
+        _upsert_sales(gains)
+    for (date, movie_id, hall_id), (tickets, revenue) in sorted(
+            keyed.items()
+    ):
+        if tickets < 0:
+            SalesRollup.objects.filter(
+                date=date, movie_id=movie_id, cinema_hall_id=hall_id
+            ).update(
+                tickets_sold=Greatest(F("tickets_sold") + tickets, Value(0)),
+                revenue=Greatest(F("revenue") + revenue, Value(Decimal(0))),
+            )
+
+
+@transaction.atomic
+def move_session_sales(previous: MovieSession) -> int:
+    tickets = Ticket.objects.filter(movie_session_id=previous.id).count()
+    if tickets:
+        adjust_sales({previous.id: -tickets}, [previous])
+        adjust_sales({previous.id: tickets})
+    return tickets
+
+
+@transaction.atomic
+def rebuild_sales_rollup(
+        start_date: str | datetime.date = None,
+        end_date: str | datetime.date = None,
+        batch_size: int = ROLLUP_BATCH_SIZE
+) -> int:
+    rollups = SalesRollup.objects.all()
+    tickets = Ticket.objects.all()
+    if start_date is not None:
+        rollups = rollups.filter(
+            date__range=date_range(start_date, end_date)
+        )
+        start, end = day_bounds(start_date, end_date)
+        tickets = tickets.filter(
+            movie_session__show_time__gte=start,
+            movie_session__show_time__lt=end,
+        )
+    rollups.delete()
+
+    sales = tickets.values(
+        show_date=TruncDate("movie_session__show_time"),
+        movie=F("movie_session__movie_id"),
+        hall=F("movie_session__cinema_hall_id"),
+    ).annotate(
+        sold=Count("id"),
+        total=Sum("movie_session__price"),
+    ).order_by()
+    rows = (
+        SalesRollup(
+            date=row["show_date"],
+            movie_id=row["movie"],
+            cinema_hall_id=row["hall"],
+            tickets_sold=row["sold"],
+            revenue=row["total"],
+        )
+        for row in sales.iterator(chunk_size=batch_size)
+    )
+    created = 0
+    while batch := list(islice(rows, batch_size)):
+        SalesRollup.objects.bulk_create(batch)
+        created += len(batch)
+    return created
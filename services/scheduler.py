@@ -0,0 +1,158 @@
+import datetime
+from collections import defaultdict
+
+from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.utils import timezone
+
+from db.models import CinemaHall, MovieSession
+from services.hall_schedule import (
+    ScheduleConflictError,
+    find_schedule_conflicts,
+    get_movie_durations,
+    hall_schedule_lock,
+)
+from services.instrumentation import instrument
+from services.movie_session import to_date
+
+
+SCHEDULE_BATCH_SIZE = 1000
+CONFLICT_POLICIES = ("skip", "raise")
+
+
+def to_time(value: str | datetime.time) -> datetime.time:
+    if isinstance(value, datetime.time):
+        return value
+    try:
+        return datetime.time.fromisoformat(value)
+    except ValueError:
+        raise ValueError(f"invalid time: {value!r}")
+
+
+def expand_rule(rule: dict) -> list[MovieSession]:
+    start_date = to_date(rule["start_date"])
+    end_date = to_date(rule.get("end_date") or start_date)
+    if end_date < start_date:
+        raise ValueError("end date must not be before start date")
+    weekdays = set(rule.get("weekdays") or range(7))
+    times = sorted(to_time(value) for value in rule["times"])
+
+    sessions = []
+    day = start_date
+    while day <= end_date:
+        if day.weekday() in weekdays:
+            for show_time in times:
+                show_time = datetime.datetime.combine(day, show_time)
+                if settings.USE_TZ:
+                    show_time = timezone.make_aware(show_time)
+                sessions.extend(
+                    MovieSession(
+                        show_time=show_time,
+                        movie_id=rule["movie"],
+                        cinema_hall_id=cinema_hall_id,
+                        price=rule.get("price", 0),
+                    )
+                    for cinema_hall_id in rule["cinema_halls"]
+                )
+        day += datetime.timedelta(days=1)
+    return sessions
+
+
+def expand_rules(rules: list[dict]) -> list[MovieSession]:
+    return [
+        movie_session for rule in rules for movie_session in expand_rule(rule)
+    ]
+
+
+def validate_cinema_halls(cinema_hall_ids: set[int]) -> None:
+    missing = cinema_hall_ids - set(
+        CinemaHall.objects.filter(id__in=cinema_hall_ids).values_list(
+            "id", flat=True
+        )
+    )
+    if missing:
+        raise ValidationError({
+            "cinema_hall": [
+                f"cinema hall instance with id {cinema_hall_id} does not "
+                f"exist."
+                for cinema_hall_id in sorted(missing)
+            ]
+        })
+
+
+def session_key(movie_session: MovieSession) -> tuple:
+    return (
+        movie_session.cinema_hall_id,
+        movie_session.movie_id,
+        movie_session.show_time,
+    )
+
+
+def split_conflicts(
+        sessions: list[MovieSession],
+        conflicts: list[dict]
+) -> tuple[set[int], list[dict]]:
+    stored = {
+        movie_session.id: session_key(movie_session)
+        for movie_session in MovieSession.objects.filter(id__in={
+            conflict["conflicts_with"]
+            for conflict in conflicts if "conflicts_with" in conflict
+        }).only("id", "cinema_hall_id", "movie_id", "show_time")
+    }
+    by_index = defaultdict(list)
+    for conflict in conflicts:
+        by_index[conflict["index"]].append(conflict)
+
+    accepted = set()
+    duplicates = set()
+    rejected = []
+    for position, movie_session in enumerate(sessions):
+        blocking = []
+        for conflict in by_index[position]:
+            if "conflicts_with" in conflict:
+                blocking.append((conflict, stored[conflict["conflicts_with"]]))
+            elif conflict["conflicts_with_index"] in accepted:
+                other = sessions[conflict["conflicts_with_index"]]
+                blocking.append((conflict, session_key(other)))
+        if not blocking:
+            accepted.add(position)
+        elif all(key == session_key(movie_session) for _, key in blocking):
+            duplicates.add(position)
+        else:
+            rejected.extend(conflict for conflict, _ in blocking)
+    return duplicates, rejected
+
+
+@instrument
+def schedule_sessions(
+        rules: list[dict],
+        on_conflict: str = "skip",
+        batch_size: int = SCHEDULE_BATCH_SIZE
+) -> dict:
+    if on_conflict not in CONFLICT_POLICIES:
+        raise ValueError(f"on_conflict must be one of {CONFLICT_POLICIES}")
+    sessions = expand_rules(rules)
+    hall_ids = {movie_session.cinema_hall_id for movie_session in sessions}
+    validate_cinema_halls(hall_ids)
+    durations = get_movie_durations(
+        {movie_session.movie_id for movie_session in sessions}
+    )
+    with hall_schedule_lock(hall_ids):
+        conflicts = find_schedule_conflicts(sessions, durations)
+        duplicates, rejected = split_conflicts(sessions, conflicts)
+        if rejected and on_conflict == "raise":
+            raise ScheduleConflictError(rejected)
+
+        conflicted = {conflict["index"] for conflict in rejected}
+        new_sessions = [
+            movie_session
+            for position, movie_session in enumerate(sessions)
+            if position not in duplicates and position not in conflicted
+        ]
+        MovieSession.objects.bulk_create(new_sessions, batch_size=batch_size)
+    return {
+        "created": len(new_sessions),
+        "skipped": len(duplicates),
+        "conflicted": len(conflicted),
+        "conflicts": rejected,
+    }
@@ -0,0 +1,112 @@
+from datetime import datetime, timedelta
+from uuid import uuid4
+
+from django.db import IntegrityError, transaction
+from django.db.models import QuerySet
+from django.utils import timezone
+
+from db.models import SeatHold
+from services.booking import (
+    MAX_BOOKING_ATTEMPTS,
+    SeatConflictError,
+    find_taken_seats,
+    get_booked_sessions,
+    local_session_locks,
+    lock_sessions_for_update,
+)
+from services.seat_map import invalidate_seat_maps
+
+
+DEFAULT_HOLD_TTL = timedelta(minutes=10)
+SWEEP_BATCH_SIZE = 1000
+
+
+def get_active_holds(hold_token: str = None) -> QuerySet[SeatHold]:
+    queryset = SeatHold.objects.filter(expires_at__gt=timezone.now())
+    if hold_token:
+        queryset = queryset.filter(token=hold_token)
+    return queryset
+
+
+def hold_seats(
+        tickets: list,
+        ttl: timedelta = DEFAULT_HOLD_TTL,
+        hold_token: str = None
+) -> str:
+    with local_session_locks(
+        {ticket["movie_session"] for ticket in tickets}
+    ):
+        return _save_holds(tickets, ttl, hold_token or uuid4().hex)
+
+
+def build_holds(
+        tickets: list[dict],
+        hold_token: str,
+        expires_at: datetime
+) -> list[SeatHold]:
+    sessions = get_booked_sessions(tickets)
+    holds = []
+    for ticket_data in tickets:
+        hold = SeatHold(
+            movie_session=sessions[ticket_data["movie_session"]],
+            row=ticket_data["row"],
+            seat=ticket_data["seat"],
+            token=hold_token,
+            expires_at=expires_at,
+        )
+        hold.clean_fields(exclude=["movie_session"])
+        hold.clean()
+        holds.append(hold)
+    return holds
+
+
+@transaction.atomic
+def _save_holds(
+        tickets: list,
+        ttl: timedelta,
+        hold_token: str
+) -> str:
+    now = timezone.now()
+    holds = build_holds(tickets, hold_token, now + ttl)
+    session_ids = {hold.movie_session_id for hold in holds}
+    lock_sessions_for_update(session_ids)
+
+    SeatHold.objects.filter(
+        movie_session_id__in=session_ids, expires_at__lte=now
+    ).delete()
+    SeatHold.objects.filter(token=hold_token).delete()
+    for _ in range(MAX_BOOKING_ATTEMPTS):
+        conflicts = find_taken_seats(holds, hold_token)
+        if conflicts:
+            raise SeatConflictError(conflicts)
+        try:
+            with transaction.atomic():
+                SeatHold.objects.bulk_create(holds)
+        except IntegrityError:
+            continue
+        invalidate_seat_maps(session_ids)
+        return hold_token
+    raise SeatConflictError(find_taken_seats(holds, hold_token))
+
+
+def release_hold(hold_token: str) -> int:
+    holds = SeatHold.objects.filter(token=hold_token)
+    session_ids = set(holds.values_list("movie_session_id", flat=True))
+    deleted, _ = holds.delete()
+    invalidate_seat_maps(session_ids)
+    return deleted
+
+
+def sweep_expired_holds(batch_size: int = SWEEP_BATCH_SIZE) -> int:
+    now = timezone.now()
+    swept = 0
+    while True:
+        expired_ids = list(
+            SeatHold.objects.filter(expires_at__lte=now).values_list(
+                "id", flat=True
+            )[:batch_size]
+        )
+        if not expired_ids:
+            return swept
+        deleted, _ = SeatHold.objects.filter(id__in=expired_ids).delete()
+        swept += deleted
@@ -0,0 +1,254 @@
+import heapq
+import threading
+from collections import OrderedDict
+from typing import Iterable, Iterator
+
+from django.db import transaction
+from django.utils import timezone
+
+from db.models import CinemaHall, MovieSession, SeatHold, Ticket
+from services.replicas import use_primary
+
+
+class SeatMap:
+    def __init__(self, rows: int, seats_in_row: int) -> None:
+        self.rows = rows
+        self.seats_in_row = seats_in_row
+        self.row_bytes = seats_in_row // 8 + 1
+        self.bits = bytearray(rows * self.row_bytes)
+        self._row_stride = self.row_bytes * 8
+        self._seats_mask = sum(
+            ((1 << seats_in_row) - 1) << (row * self._row_stride)
+            for row in range(rows)
+        )
+        self.expires_at = None
+
+    @classmethod
+    def for_hall(cls, cinema_hall: CinemaHall) -> "SeatMap":
+        return cls(cinema_hall.rows, cinema_hall.seats_in_row)
+
+    @property
+    def capacity(self) -> int:
+        return self.rows * self.seats_in_row
+
+    def contains(self, row: int, seat: int) -> bool:
+        return 1 <= row <= self.rows and 1 <= seat <= self.seats_in_row
+
+    def _position(self, row: int, seat: int) -> tuple[int, int]:
+        if not self.contains(row, seat):
+            raise IndexError(f"seat ({row}, {seat}) is outside of the hall")
+        offset = (row - 1) * self.row_bytes + (seat - 1) // 8
+        return offset, 1 << ((seat - 1) % 8)
+
+    def take(self, row: int, seat: int) -> None:
+        offset, mask = self._position(row, seat)
+        self.bits[offset] |= mask
+
+    def release(self, row: int, seat: int) -> None:
+        offset, mask = self._position(row, seat)
+        self.bits[offset] &= ~mask
+
+    def is_taken(self, row: int, seat: int) -> bool:
+        offset, mask = self._position(row, seat)
+        return bool(self.bits[offset] & mask)
+
+    def taken_count(self) -> int:
+        return int.from_bytes(self.bits, "little").bit_count()
+
+    def free_count(self) -> int:
+        return self.capacity - self.taken_count()
+
+    def free_mask(self) -> int:
+        return self._seats_mask & ~int.from_bytes(self.bits, "little")
+
+    def free_blocks_mask(self, size: int) -> int:
+        if size < 1:
+            raise ValueError("block size must be positive")
+        mask = self.free_mask()
+        covered = 1
+        while covered < size and mask:
+            step = min(covered, size - covered)
+            mask &= mask >> step
+            covered += step
+        return mask
+
+    def seat_at(self, bit_index: int) -> tuple[int, int]:
+        row, seat = divmod(bit_index, self._row_stride)
+        return row + 1, seat + 1
+
+    def iter_free_blocks(self, size: int) -> Iterator[tuple[int, int]]:
+        mask = self.free_blocks_mask(size)
+        while mask:
+            lowest = mask & -mask
+            yield self.seat_at(lowest.bit_length() - 1)
+            mask ^= lowest
+
+    def find_adjacent_free_seats(self, size: int) -> list[dict]:
+        for row, seat in self.iter_free_blocks(size):
+            return [
+                {"row": row, "seat": seat + offset}
+                for offset in range(size)
+            ]
+        return []
+
+    def block_score(self, row: int, seat: int, size: int) -> float:
+        row_offset = (row - (self.rows + 1) / 2) / self.rows
+        seat_offset = (
+            seat + (size - 1) / 2 - (self.seats_in_row + 1) / 2
+        ) / self.seats_in_row
+        return row_offset * row_offset + seat_offset * seat_offset
+
+    def best_free_blocks(self, size: int, limit: int) -> list[dict]:
+        candidates = [
+            (self.block_score(row, seat, size), row, seat)
+            for row, seat in self.iter_free_blocks(size)
+        ]
+        heapq.heapify(candidates)
+        chosen = []
+        while candidates and len(chosen) < limit:
+            score, row, seat = heapq.heappop(candidates)
+            if any(
+                row == chosen_row and abs(seat - chosen_seat) < size
+                for _, chosen_row, chosen_seat in chosen
+            ):
+                continue
+            chosen.append((score, row, seat))
+        return [
+            {
+                "score": score,
+                "seats": [
+                    {"row": row, "seat": seat + offset}
+                    for offset in range(size)
+                ],
+            }
+            for score, row, seat in chosen
+        ]
+
+    def taken_seats(self) -> list[dict]:
+        seats = []
+        for offset, byte in enumerate(self.bits):
+            if not byte:
+                continue
+            row, byte_index = divmod(offset, self.row_bytes)
+            for bit in range(8):
+                if byte >> bit & 1:
+                    seats.append(
+                        {"row": row + 1, "seat": byte_index * 8 + bit + 1}
+                    )
+        return seats
+
+
+def load_seat_map(
+        movie_session_id: int,
+        ignore_hold_token: str = None
+) -> SeatMap | None:
+    hall_size = MovieSession.objects.filter(
+        id=movie_session_id
+    ).values_list(
+        "cinema_hall__rows", "cinema_hall__seats_in_row"
+    ).first()
+    if hall_size is None:
+        return None
+
+    seat_map = SeatMap(*hall_size)
+    taken = Ticket.objects.filter(
+        movie_session_id=movie_session_id
+    ).values_list("row", "seat")
+    for row, seat in taken:
+        if seat_map.contains(row, seat):
+            seat_map.take(row, seat)
+
+    holds = SeatHold.objects.filter(
+        movie_session_id=movie_session_id, expires_at__gt=timezone.now()
+    ).exclude(token=ignore_hold_token).values_list("row", "seat", "expires_at")
+    for row, seat, expires_at in holds:
+        if seat_map.contains(row, seat):
+            seat_map.take(row, seat)
+        if seat_map.expires_at is None or expires_at < seat_map.expires_at:
+            seat_map.expires_at = expires_at
+    return seat_map
+
+
+class SeatMapCache:
+    def __init__(self, maxsize: int = 1024) -> None:
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._maps = OrderedDict()
+        self._generation = 0
+        self._lock = threading.Lock()
+
+    def _lookup(self, movie_session_id: int) -> SeatMap | None:
+        seat_map = self._maps.get(movie_session_id)
+        if (
+            seat_map is not None
+            and seat_map.expires_at is not None
+            and seat_map.expires_at <= timezone.now()
+        ):
+            del self._maps[movie_session_id]
+            return None
+        if seat_map is not None:
+            self._maps.move_to_end(movie_session_id)
+            self.hits += 1
+        return seat_map
+
+    def peek(self, movie_session_id: int) -> SeatMap | None:
+        with self._lock:
+            return self._lookup(movie_session_id)
+
+    def get(self, movie_session_id: int) -> SeatMap | None:
+        with self._lock:
+            seat_map = self._lookup(movie_session_id)
+            if seat_map is not None:
+                return seat_map
+            self.misses += 1
+            generation = self._generation
+
+        with use_primary():
+            seat_map = load_seat_map(movie_session_id)
+        if seat_map is None:
+            return None
+
+        with self._lock:
+            if generation == self._generation:
+                self._maps[movie_session_id] = seat_map
+                while len(self._maps) > self.maxsize:
+                    self._maps.popitem(last=False)
+        return seat_map
+
+    def invalidate(self, movie_session_id: int) -> None:
+        with self._lock:
+            self._generation += 1
+            self._maps.pop(movie_session_id, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._generation += 1
+            self._maps.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "size": len(self._maps),
+                "maxsize": self.maxsize,
+            }
+
+
+seat_map_cache = SeatMapCache()
+
+
+def invalidate_seat_maps(movie_session_ids: Iterable[int]) -> None:
+    movie_session_ids = set(movie_session_ids)
+
+    def invalidate() -> None:
+        for movie_session_id in movie_session_ids:
+            seat_map_cache.invalidate(movie_session_id)
+
+    invalidate()
+    transaction.on_commit(invalidate)
@@ -0,0 +1,34 @@
+from typing import Callable, Iterable
+
+from django.db.models import Model
+
+
+def supplied_fields(**fields) -> dict:
+    return {
+        name: value for name, value in fields.items()
+        if value is not None and value != ""
+    }
+
+
+def partial_update(
+        model: type[Model],
+        pk: int,
+        fields: dict,
+        before_save: Callable[[Model], None] = None,
+        load: Iterable[str] = ()
+) -> bool:
+    queryset = model.objects.filter(pk=pk)
+    if before_save is None:
+        if not fields:
+            return queryset.exists()
+        return queryset.update(**fields) > 0
+
+    instance = queryset.only(*fields, *load).first()
+    if instance is None:
+        return False
+    if fields:
+        for name, value in fields.items():
+            setattr(instance, name, value)
+        before_save(instance)
+        instance.save(update_fields=list(fields))
+    return True
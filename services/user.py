@@ -1,6 +1,114 @@
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+from itertools import islice
+from typing import Iterable
+
+from django.contrib.auth.hashers import (
+    get_hasher,
+    identify_hasher,
+    make_password,
+)
+from django.core.exceptions import ValidationError
+from django.db import transaction
+
 from db.models import User
+from services.instrumentation import instrument
+from services.updates import partial_update, supplied_fields
+
+
+PROVISION_BATCH_SIZE = 2000
+HASH_CHUNK_SIZE = 64
+POOL_HASHING_THRESHOLD = 500
+
+
+def encode_password(password: str = "", password_hash: str = "") -> str:
+    if not password_hash:
+        return make_password(password)
+    try:
+        identify_hasher(password_hash)
+    except ValueError:
+        raise ValidationError({
+            "password_hash": ["password hash uses an unknown algorithm"]
+        })
+    return password_hash
 
 
+def hash_passwords(
+        passwords: list[str],
+        pool: ProcessPoolExecutor = None
+) -> list[str]:
+    if pool is None or len(passwords) < 2:
+        return [make_password(password) for password in passwords]
+    return list(pool.map(
+        partial(make_password, salt=None, hasher=get_hasher()),
+        passwords,
+        chunksize=HASH_CHUNK_SIZE,
+    ))
+
+
+def build_users(
+        users: list[dict],
+        pool: ProcessPoolExecutor = None
+) -> list[User]:
+    hashes = iter(hash_passwords(
+        [user["password"] for user in users if not user.get("password_hash")],
+        pool,
+    ))
+    return [
+        User(
+            username=User.normalize_username(user["username"]),
+            email=User.objects.normalize_email(user.get("email", "")),
+            first_name=user.get("first_name", ""),
+            last_name=user.get("last_name", ""),
+            password=(
+                encode_password(password_hash=user["password_hash"])
+                if user.get("password_hash") else next(hashes)
+            ),
+        )
+        for user in users
+    ]
+
+
+def hashing_pool(
+        users: list[dict],
+        processes: int = None
+) -> ProcessPoolExecutor | None:
+    if processes is None:
+        passwords = sum(1 for user in users if not user.get("password_hash"))
+        if passwords < POOL_HASHING_THRESHOLD or (os.cpu_count() or 1) < 2:
+            return None
+    elif processes <= 1:
+        return None
+    return ProcessPoolExecutor(
+        processes, mp_context=multiprocessing.get_context("spawn")
+    )
+
+
+@instrument
+def provision_users(
+        users: Iterable[dict],
+        processes: int = None,
+        batch_size: int = PROVISION_BATCH_SIZE
+) -> int:
+    users = iter(users)
+    batch = list(islice(users, batch_size))
+    pool = hashing_pool(batch, processes)
+    created = 0
+    try:
+        with transaction.atomic():
+            while batch:
+                User.objects.bulk_create(build_users(batch, pool))
+                created += len(batch)
+                batch = list(islice(users, batch_size))
+    finally:
+        if pool is not None:
+            pool.shutdown()
+    return created
+
+
+@instrument
 def create_user(
         username: str,
         password: str,
@@ -17,27 +125,35 @@ def create_user(
     )
 
 
+@instrument
 def get_user(user_id: int) -> User:
     return User.objects.get(pk=user_id)
 
 
+@instrument
 def update_user(
         user_id: int,
         username: str = "",
         password: str = "",
         email: str = "",
         first_name: str = "",
-        last_name: str = ""
-) -> None:
-    user = User.objects.get(pk=user_id)
-    if username:
-        user.username = username
-    if password:
-        user.set_password(password)
-    if email:
-        user.email = email
-    if first_name:
-        user.first_name = first_name
-    if last_name:
-        user.last_name = last_name
-    user.save()
+        last_name: str = "",
+        password_hash: str = ""
+) -> bool:
+    fields = supplied_fields(
+        username=username,
+        email=email,
+        first_name=first_name,
+        last_name=last_name,
+    )
+    if password_hash:
+        fields["password"] = encode_password(password_hash=password_hash)
+    elif password:
+        fields["password"] = password
+        return partial_update(
+            User,
+            user_id,
+            fields,
+            before_save=lambda user: user.set_password(password),
+        )
+    return partial_update(User, user_id, fields)
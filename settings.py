@@ -8,13 +8,60 @@ SECRET_KEY = "6few3nci_q_o@l1dlbk81%wcxe!*6r29yu629&d97!hiqat9fa"
 
 DEFAULT_AUTO_FIELD = "django.db.models.AutoField"
 
+SQLITE_PROFILES = {
+    "default": {
+        "PRAGMAS": {},
+        "OPTIONS": {},
+        "CONN_MAX_AGE": 0,
+    },
+    "concurrent": {
+        "PRAGMAS": {
+            "journal_mode": "WAL",
+            "synchronous": "NORMAL",
+            "busy_timeout": 5000,
+            "cache_size": -64000,
+            "mmap_size": 268435456,
+            "temp_store": "MEMORY",
+        },
+        "OPTIONS": {"transaction_mode": "IMMEDIATE"},
+        "CONN_MAX_AGE": 600,
+    },
+}
+
+SQLITE_PROFILE = os.environ.get("SQLITE_PROFILE", "default")
+
+SQLITE_PRAGMAS = SQLITE_PROFILES[SQLITE_PROFILE]["PRAGMAS"]
+
 DATABASES = {
     "default": {
-        "ENGINE": "django.db.backends.sqlite3",
-        "NAME": os.path.join(BASE_DIR, "db.sqlite3"),
+        "ENGINE": "db.backends.sqlite3",
+        "NAME": os.environ.get(
+            "DATABASE_NAME", os.path.join(BASE_DIR, "db.sqlite3")
+        ),
+        "OPTIONS": SQLITE_PROFILES[SQLITE_PROFILE]["OPTIONS"],
+        "CONN_MAX_AGE": SQLITE_PROFILES[SQLITE_PROFILE]["CONN_MAX_AGE"],
     }
 }
 
+DATABASE_REPLICAS = {}
+
+for index, replica in enumerate(
+        filter(None, os.environ.get("DATABASE_REPLICAS", "").split(","))
+):
+    replica_name, _, replica_weight = replica.partition("=")
+    DATABASES[f"replica_{index}"] = {
+        "ENGINE": "db.backends.sqlite3",
+        "NAME": replica_name,
+        "OPTIONS": SQLITE_PROFILES[SQLITE_PROFILE]["OPTIONS"],
+        "CONN_MAX_AGE": SQLITE_PROFILES[SQLITE_PROFILE]["CONN_MAX_AGE"],
+        "TEST": {"MIRROR": "default"},
+    }
+    DATABASE_REPLICAS[f"replica_{index}"] = int(replica_weight or 1)
+
+DATABASE_ROUTERS = ["db.routers.ReplicaRouter"]
+
+REPLICA_READ_AFTER_WRITE_SECONDS = 1.0
+
 LANGUAGE_CODE = "en-us"
 
 TIME_ZONE = "Europe/Kiev"
@@ -30,3 +77,29 @@ INSTALLED_APPS = [
 ]
 
 AUTH_USER_MODEL = "db.User"
+
+PASSWORD_HASHER_PROFILES = {
+    "default": [
+        "django.contrib.auth.hashers.PBKDF2PasswordHasher",
+        "django.contrib.auth.hashers.PBKDF2SHA1PasswordHasher",
+        "django.contrib.auth.hashers.Argon2PasswordHasher",
+        "django.contrib.auth.hashers.BCryptSHA256PasswordHasher",
+        "django.contrib.auth.hashers.ScryptPasswordHasher",
+    ],
+    "fast": [
+        "db.hashers.FastPBKDF2PasswordHasher",
+        "django.contrib.auth.hashers.PBKDF2SHA1PasswordHasher",
+    ],
+}
+
+PASSWORD_HASHERS = PASSWORD_HASHER_PROFILES[
+    os.environ.get("PASSWORD_HASHER_PROFILE", "default")
+]
+
+SERVICE_INSTRUMENTATION = False
+
+CATALOG_CACHE = {
+    "BACKEND": os.environ.get("CATALOG_CACHE_BACKEND", "local"),
+    "TTL": 300,
+    "MAXSIZE": 4096,
+}
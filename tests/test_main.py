@@ -1,10 +1,20 @@
 import pytest
+import asyncio
 import datetime
+import decimal
+import io
+import json
+import pickle
+import threading
 
 from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
 from django.conf import settings
 from django.core.exceptions import ValidationError
+from django.core.management import call_command
+from django.db import connection, connections, transaction
 
+from db.hashers import FastPBKDF2PasswordHasher
 from db.models import (
     Actor,
     Genre,
@@ -12,19 +22,103 @@ from db.models import (
     MovieSession,
     CinemaHall,
     Order,
+    SalesRollup,
+    SeatHold,
     Ticket
 )
-from services.movie import get_movies, create_movie
+from services.async_api import (
+    acreate_order,
+    aget_movies,
+    aget_orders,
+    aget_taken_seats,
+    arecommend_seats,
+)
+from services.booking import (
+    SeatConflictError,
+    booking_session_ids,
+    find_taken_seats,
+)
+from services.fixture_import import (
+    FixtureImporter,
+    import_fixture,
+    iter_fixture_records,
+)
+from services.occupancy import reconcile_occupancy
+from services.order_export import export_orders
+from services.catalog_cache import (
+    DjangoCacheBackend,
+    catalog_cache,
+    create_catalog_cache,
+    warm_up_catalog_cache,
+)
+from services.cinema_hall import create_cinema_hall, get_cinema_halls
+from services.hall_schedule import ScheduleConflictError
+from services.instrumentation import (
+    instrument,
+    instrumentation_enabled,
+    registry,
+)
+from services.movie import (
+    create_movie,
+    get_movie_by_id,
+    get_movies,
+    search_movies,
+)
+from services.movie_search import TrigramIndex, movie_search_index
 from services.movie_session import (
+    create_movie_session,
+    delete_movie_session_by_id,
+    find_adjacent_free_seats,
+    free_seat_count,
+    get_movies_sessions,
+    get_schedule,
     get_taken_seats,
+    update_movie_session,
+    is_seat_free,
+    recommend_seats,
+)
+from services.user import (
+    POOL_HASHING_THRESHOLD,
+    create_user,
+    get_user,
+    hashing_pool,
+    provision_users,
+    update_user,
+)
+from services.order import (
+    create_order,
+    get_order_history,
+    get_orders,
+    get_tickets_for_order,
 )
-from services.user import create_user, get_user, update_user
-from services.order import create_order, get_orders
+from db.backends.sqlite3.base import DatabaseWrapper
+from services.replicas import ReplicaSelector, configure_replicas
+from services.sales_analytics import (
+    get_hall_utilization,
+    get_sales_time_series,
+    get_top_movies,
+)
+from services.sales_rollup import rebuild_sales_rollup
+from services.scheduler import schedule_sessions
+from services.seat_hold import hold_seats, release_hold, sweep_expired_holds
+from services.seat_map import SeatMap, SeatMapCache, seat_map_cache
 
 
 pytestmark = pytest.mark.django_db
 
 
+@pytest.fixture(autouse=True)
+def fast_password_hasher(settings):
+    settings.PASSWORD_HASHERS = settings.PASSWORD_HASHER_PROFILES["fast"]
+
+
+@pytest.fixture(autouse=True)
+def clear_in_memory_caches():
+    seat_map_cache.clear()
+    movie_search_index.clear()
+    catalog_cache.clear()
+
+
 @pytest.fixture()
 def genres_data():
     Genre.objects.create(name="Action")
@@ -396,3 +490,1212 @@ def test_create_movie_transaction_atomic(genres_data, actors_data):
                      actors_ids=[1, 2, 3])
 
     assert Movie.objects.all().count() == 0
+
+
+def test_create_order_constant_number_of_queries(
+        create_order_data,
+        django_assert_max_num_queries
+):
+    with django_assert_max_num_queries(12):
+        create_order(
+            tickets=[{"row": 1, "seat": seat, "movie_session": 1}
+                     for seat in range(1, 3)],
+            username="user_1"
+        )
+    with django_assert_max_num_queries(12):
+        create_order(
+            tickets=[{"row": 2, "seat": seat, "movie_session": 1}
+                     for seat in range(1, 13)],
+            username="user_1"
+        )
+    assert Ticket.objects.count() == 14
+
+
+def test_create_order_validates_every_ticket(create_order_data):
+    with pytest.raises(ValidationError):
+        create_order(
+            tickets=[
+                {"row": 1, "seat": 1, "movie_session": 1},
+                {"row": 15, "seat": 1, "movie_session": 1},
+            ],
+            username="user_1"
+        )
+    assert Order.objects.count() == 0
+    assert Ticket.objects.count() == 0
+
+
+def test_create_order_rejects_taken_seats(create_order_data, tickets):
+    create_order(tickets=tickets, username="user_1")
+    with pytest.raises(ValidationError):
+        create_order(tickets=tickets[:1], username="user_1")
+    with pytest.raises(ValidationError):
+        create_order(
+            tickets=[{"row": 3, "seat": 3, "movie_session": 1}] * 2,
+            username="user_1"
+        )
+    assert Order.objects.count() == 1
+    assert Ticket.objects.count() == 2
+
+
+def test_seat_map_bits():
+    seat_map = SeatMap(rows=3, seats_in_row=10)
+    seat_map.take(1, 1)
+    seat_map.take(2, 10)
+    seat_map.take(3, 9)
+    seat_map.release(3, 9)
+    assert len(seat_map.bits) == 6
+    assert seat_map.is_taken(2, 10)
+    assert not seat_map.is_taken(3, 9)
+    assert seat_map.taken_seats() == [
+        {"row": 1, "seat": 1},
+        {"row": 2, "seat": 10},
+    ]
+    with pytest.raises(IndexError):
+        seat_map.take(4, 1)
+
+
+def test_get_taken_seats_is_cached(
+        tickets_data,
+        django_assert_num_queries
+):
+    get_taken_seats(movie_session_id=1)
+    with django_assert_num_queries(0):
+        assert get_taken_seats(movie_session_id=1) == [
+            {"row": 7, "seat": 10},
+            {"row": 7, "seat": 11},
+        ]
+    assert seat_map_cache.stats()["hits"] == 1
+    assert seat_map_cache.stats()["misses"] == 1
+    assert get_taken_seats(movie_session_id=100) == []
+
+
+def test_seat_map_cache_invalidated_on_ticket_writes(tickets_data):
+    assert get_taken_seats(movie_session_id=1) == [
+        {"row": 7, "seat": 10},
+        {"row": 7, "seat": 11},
+    ]
+    Ticket.objects.create(movie_session_id=1, order_id=1, row=1, seat=1)
+    Ticket.objects.filter(row=7, seat=11).delete()
+    assert get_taken_seats(movie_session_id=1) == [
+        {"row": 1, "seat": 1},
+        {"row": 7, "seat": 10},
+    ]
+    create_order(
+        tickets=[{"row": 2, "seat": 2, "movie_session": 1}],
+        username="user1"
+    )
+    assert {"row": 2, "seat": 2} in get_taken_seats(movie_session_id=1)
+
+
+def test_seat_map_cache_lru_eviction(tickets_data):
+    cache = SeatMapCache(maxsize=2)
+    cache.get(1)
+    cache.get(2)
+    cache.get(1)
+    cache.get(3)
+    cache.get(2)
+    assert cache.stats() == {
+        "hits": 1,
+        "misses": 4,
+        "hit_rate": 0.2,
+        "size": 2,
+        "maxsize": 2,
+    }
+
+
+def test_seat_map_adjacent_blocks_do_not_cross_rows():
+    seat_map = SeatMap(rows=2, seats_in_row=8)
+    for seat in range(1, 6):
+        seat_map.take(1, seat)
+    for seat in (3, 6):
+        seat_map.take(2, seat)
+    assert seat_map.free_count() == 9
+    assert seat_map.find_adjacent_free_seats(3) == [
+        {"row": 1, "seat": 6},
+        {"row": 1, "seat": 7},
+        {"row": 1, "seat": 8},
+    ]
+    assert list(seat_map.iter_free_blocks(2)) == [
+        (1, 6), (1, 7), (2, 1), (2, 4), (2, 7)
+    ]
+    assert seat_map.find_adjacent_free_seats(4) == []
+
+
+def test_seat_map_recommends_centered_blocks():
+    seat_map = SeatMap(rows=5, seats_in_row=6)
+    assert [
+        block["seats"][0] for block in seat_map.best_free_blocks(2, 3)
+    ] == [{"row": 3, "seat": 3}, {"row": 2, "seat": 3}, {"row": 4, "seat": 3}]
+    seat_map.take(3, 3)
+    assert seat_map.best_free_blocks(2, 1) == [{
+        "score": (1 / 6) ** 2,
+        "seats": [{"row": 3, "seat": 4}, {"row": 3, "seat": 5}],
+    }]
+    assert seat_map.best_free_blocks(7, 3) == []
+
+
+def test_recommend_seats(tickets_data):
+    recommendations = recommend_seats(1, 4, limit=2)
+    assert [block["seats"] for block in recommendations] == [
+        [{"row": row, "seat": seat} for seat in range(5, 9)]
+        for row in (5, 6)
+    ]
+    assert asyncio.run(arecommend_seats(1, 4, 2)) == recommendations
+    assert recommend_seats(1, 15) == []
+    with pytest.raises(ValidationError):
+        recommend_seats(1, 0)
+    with pytest.raises(ValidationError):
+        recommend_seats(1, 2, limit=0)
+    for seats_count, limit in ((2, 0), (0, 2)):
+        with pytest.raises(ValidationError):
+            asyncio.run(arecommend_seats(1, seats_count, limit))
+
+
+def test_recommend_seats_in_a_sold_out_hall(create_order_data):
+    CinemaHall.objects.update(rows=1, seats_in_row=3)
+    create_order(
+        tickets=[{"row": 1, "seat": seat, "movie_session": 1}
+                 for seat in range(1, 4)],
+        username="user_1",
+    )
+    assert recommend_seats(1, 1) == []
+
+
+def test_movie_session_seat_availability(tickets_data):
+    assert free_seat_count(movie_session_id=1) == 118
+    assert is_seat_free(movie_session_id=1, row=7, seat=9)
+    assert not is_seat_free(movie_session_id=1, row=7, seat=10)
+    assert not is_seat_free(movie_session_id=1, row=11, seat=1)
+    assert find_adjacent_free_seats(movie_session_id=2, seats_count=27) == [
+        {"row": 1, "seat": seat} for seat in range(1, 28)
+    ]
+    with pytest.raises(MovieSession.DoesNotExist):
+        free_seat_count(movie_session_id=100)
+
+
+def test_create_order_reports_conflicting_seats(create_order_data, tickets):
+    create_order(tickets=tickets, username="user_1")
+    with pytest.raises(SeatConflictError) as error_info:
+        create_order(
+            tickets=[
+                {"row": 1, "seat": 1, "movie_session": 1},
+                {"row": 10, "seat": 9, "movie_session": 1},
+            ],
+            username="user_1"
+        )
+    assert error_info.value.conflicts == [
+        {"movie_session": 1, "row": 10, "seat": 9}
+    ]
+    assert Order.objects.count() == 1
+
+
+def test_create_order_replaces_taken_seats(create_order_data, tickets):
+    create_order(tickets=tickets, username="user_1")
+    order = create_order(
+        tickets=[
+            {"row": 10, "seat": 9, "movie_session": 1},
+            {"row": 10, "seat": 9, "movie_session": 1},
+            {"row": 5, "seat": 5, "movie_session": 1},
+        ],
+        username="user_1",
+        replace_taken=True
+    )
+    assert sorted(
+        Ticket.objects.filter(order=order).values_list("row", "seat")
+    ) == [(5, 5), (10, 7), (10, 10)]
+
+
+@pytest.mark.django_db(transaction=True)
+def test_create_order_concurrent_stress():
+    movie = Movie.objects.create(title="Speed", description="Description")
+    cinema_hall = CinemaHall.objects.create(name="Small",
+                                            rows=4,
+                                            seats_in_row=6)
+    MovieSession.objects.create(
+        show_time=datetime.datetime.now(),
+        movie=movie,
+        cinema_hall=cinema_hall,
+    )
+    get_user_model().objects.create_user(username="user_1")
+    booked_orders = []
+    unexpected_errors = []
+
+    def book(worker: int) -> None:
+        try:
+            for attempt in range(6):
+                seats = [
+                    {"row": 1 + (worker + attempt) % 4,
+                     "seat": 1 + seat,
+                     "movie_session": 1}
+                    for seat in range(2)
+                ]
+                try:
+                    booked_orders.append(create_order(
+                        tickets=seats,
+                        username="user_1",
+                        replace_taken=worker % 2 == 0
+                    ))
+                except SeatConflictError:
+                    continue
+        except Exception as error:
+            unexpected_errors.append(error)
+        finally:
+            connection.close()
+
+    workers = [
+        threading.Thread(target=book, args=(worker,)) for worker in range(8)
+    ]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+
+    assert unexpected_errors == []
+    assert len(booked_orders) == 12
+    sold_seats = list(Ticket.objects.values_list("order_id", "row", "seat"))
+    assert len(sold_seats) == 24
+    assert len({(row, seat) for _, row, seat in sold_seats}) == 24
+    assert {order_id for order_id, _, _ in sold_seats} == {
+        order.id for order in booked_orders
+    }
+
+
+def test_seat_holds_block_other_orders(create_order_data, tickets):
+    hold_token = hold_seats(tickets)
+    assert get_taken_seats(movie_session_id=1) == [
+        {"row": 10, "seat": 8},
+        {"row": 10, "seat": 9},
+    ]
+    with pytest.raises(SeatConflictError):
+        create_order(tickets=tickets, username="user_1")
+    with pytest.raises(SeatConflictError):
+        hold_seats(tickets[:1])
+
+    release_hold(hold_token)
+    assert get_taken_seats(movie_session_id=1) == []
+    create_order(tickets=tickets, username="user_1")
+    assert Ticket.objects.count() == 2
+
+
+def test_seat_holds_turn_into_tickets(create_order_data, tickets):
+    hold_token = hold_seats(tickets)
+    assert booking_session_ids([], hold_token) == {1}
+    order = create_order(tickets=[], username="user_1",
+                         hold_token=hold_token)
+    assert list(
+        Ticket.objects.filter(order=order).values_list("row", "seat")
+    ) == [(10, 8), (10, 9)]
+    assert SeatHold.objects.count() == 0
+    with pytest.raises(ValidationError):
+        create_order(tickets=[], username="user_1", hold_token=hold_token)
+
+
+def test_concurrent_seat_hold_reports_conflict(
+        create_order_data,
+        tickets,
+        monkeypatch
+):
+    hold_seats(tickets[:1])
+    checks = []
+
+    def racing_find_taken_seats(*args) -> list:
+        checks.append(args)
+        return [] if len(checks) == 1 else find_taken_seats(*args)
+
+    monkeypatch.setattr(
+        "services.seat_hold.find_taken_seats", racing_find_taken_seats
+    )
+    with pytest.raises(SeatConflictError) as error_info:
+        hold_seats(tickets)
+    assert error_info.value.conflicts == [
+        {"movie_session": 1, "row": 10, "seat": 8}
+    ]
+    with pytest.raises(ValidationError):
+        hold_seats([{"row": 15, "seat": 1, "movie_session": 1}])
+
+
+def test_expired_seat_holds_are_ignored_and_swept(create_order_data,
+                                                  tickets):
+    hold_seats(tickets, ttl=datetime.timedelta(minutes=5))
+    hold_token = hold_seats(
+        [{"row": 1, "seat": 1, "movie_session": 1}],
+        ttl=datetime.timedelta(seconds=-1)
+    )
+    assert get_taken_seats(movie_session_id=1) == [
+        {"row": 10, "seat": 8},
+        {"row": 10, "seat": 9},
+    ]
+    hold_seats([{"row": 1, "seat": 1, "movie_session": 1}],
+               ttl=datetime.timedelta(seconds=-1))
+    assert not SeatHold.objects.filter(token=hold_token).exists()
+    assert sweep_expired_holds(batch_size=1) == 1
+    assert SeatHold.objects.count() == 2
+
+
+def assert_rendered_with_max_queries(
+        rows,
+        max_queries,
+        django_assert_max_num_queries
+):
+    with django_assert_max_num_queries(max_queries):
+        return [str(row) for row in rows]
+
+
+def test_listings_render_with_bounded_queries(
+        tickets_data,
+        django_assert_max_num_queries
+):
+    Ticket.objects.create(movie_session_id=3, order_id=1, row=1, seat=1)
+    assert assert_rendered_with_max_queries(
+        get_tickets_for_order(order_id=1),
+        1,
+        django_assert_max_num_queries
+    ) == [
+        "Matrix 2019-08-19 20:30:00 (row: 7, seat: 10)",
+        "Matrix 2019-08-19 20:30:00 (row: 7, seat: 11)",
+        "The Good, the Bad and the Ugly 2021-04-03 13:50:00 "
+        "(row: 1, seat: 1)",
+    ]
+    assert len(assert_rendered_with_max_queries(
+        get_movies_sessions(),
+        1,
+        django_assert_max_num_queries
+    )) == 4
+    with django_assert_max_num_queries(2):
+        rendered_tickets = [
+            str(ticket)
+            for order in get_orders(username="user1")
+            for ticket in order.tickets.all()
+        ]
+    assert len(rendered_tickets) == 5
+
+
+def test_service_instrumentation(tickets_data):
+    registry.reset()
+    get_taken_seats(movie_session_id=1)
+    assert registry.snapshot() == {}
+
+    with instrumentation_enabled():
+        get_taken_seats(movie_session_id=1)
+        get_taken_seats(movie_session_id=1)
+        list(get_orders())
+    snapshot = registry.snapshot()
+    taken_seats_stats = snapshot["services.movie_session.get_taken_seats"]
+    assert taken_seats_stats["calls"] == 2
+    assert taken_seats_stats["rows"] == 4
+    assert taken_seats_stats["latency_histogram"]["+Inf"] == 2
+    assert snapshot["services.order.get_orders"]["calls"] == 1
+    assert not registry.enabled
+
+    registry.reset()
+    seat_map_cache.clear()
+    with instrumentation_enabled():
+        get_taken_seats(movie_session_id=1)
+    assert registry.snapshot()[
+        "services.movie_session.get_taken_seats"
+    ]["queries"] == 3
+    assert (
+        'service_calls_total{function="services.movie_session.'
+        'get_taken_seats"} 1'
+    ) in registry.to_prometheus()
+    registry.reset()
+
+
+def test_instrumentation_charges_lazy_querysets_when_evaluated(
+        tickets_data
+):
+    registry.reset()
+    with instrumentation_enabled():
+        orders = get_orders()
+        assert registry.snapshot()["services.order.get_orders"][
+            "queries"
+        ] == 0
+        assert len(list(orders)) == Order.objects.count()
+        movies = list(get_movies())
+    snapshot = registry.snapshot()
+    assert snapshot["services.order.get_orders"]["queries"] > 0
+    assert snapshot["services.order.get_orders"]["rows"] == len(orders)
+    assert snapshot["services.movie.get_movies"]["rows"] == len(movies)
+    assert snapshot["services.movie.get_movies"]["calls"] == 1
+    assert [
+        order.id for order in pickle.loads(pickle.dumps(orders))
+    ] == [order.id for order in orders]
+    registry.reset()
+
+
+def test_instrumentation_attributes_queries_to_innermost_call(
+        movie_sessions_data
+):
+    @instrument
+    def inner() -> None:
+        list(MovieSession.objects.all())
+
+    @instrument
+    def outer() -> None:
+        list(Movie.objects.all())
+        inner()
+        inner()
+
+    registry.reset()
+    with instrumentation_enabled():
+        outer()
+    snapshot = registry.snapshot()
+    assert [
+        (stats["calls"], stats["queries"]) for stats in snapshot.values()
+    ] == [(2, 2), (1, 1)]
+    registry.reset()
+
+
+def test_benchmark_harness_on_tiny_dataset():
+    from benchmarks.run import compare_results, run_benchmarks
+    from benchmarks.seed import seed_dataset
+
+    counts = seed_dataset({
+        "halls": 3,
+        "movies": 10,
+        "actors": 5,
+        "users": 4,
+        "sessions": 6,
+        "tickets": 60,
+    })
+    assert counts["tickets"] == Ticket.objects.count() == 60
+    assert counts["orders"] == Order.objects.count()
+
+    results = run_benchmarks(repeats=2)
+    assert set(results) >= {
+        "create_order", "get_taken_seats_cold", "get_movies_filtered",
+        "get_orders_username", "get_movies_sessions_date",
+    }
+    assert Ticket.objects.count() == 60
+
+    baseline = {"results": {"create_order": {"median_ms": 1.0}}}
+    current = {"results": {"create_order": {"median_ms": 1.5}}}
+    assert compare_results(current, baseline, threshold=0.6) == []
+    assert compare_results(current, baseline, threshold=0.2)[0][
+        "benchmark"
+    ] == "create_order"
+
+
+def test_prepare_database_reseeds_when_the_scale_changes(
+        tmp_path,
+        monkeypatch
+):
+    from benchmarks import run
+
+    monkeypatch.setattr(run, "dataset_path",
+                        lambda: str(tmp_path / "dataset.json"))
+    scale = {"halls": 2, "movies": 3, "actors": 2, "users": 2,
+             "sessions": 3, "tickets": 10}
+    assert run.prepare_database(scale)["seeded"]
+    assert not run.prepare_database(scale)["seeded"]
+    assert run.prepare_database({**scale, "halls": 4})["seeded"]
+    assert CinemaHall.objects.count() == 4
+
+
+def test_trigram_index_search_modes():
+    index = TrigramIndex()
+    index.load([
+        (1, "Harry Potter 1"),
+        (2, "Harry Potter 2"),
+        (3, "Dirty Harry"),
+        (4, "Hairy Pottery"),
+    ])
+    assert index.containing("rry pot") == {1, 2}
+    assert index.containing("ha") is None
+    assert index.with_prefix("harr") == {1, 2, 3}
+    assert index.search("harry potter 1")[0] == 1
+    assert index.search("hary poter", mode="fuzzy")[:2] == [1, 2]
+    index.add(3, "Clean Harry")
+    index.remove(1)
+    assert index.with_prefix("dirty") == set()
+    assert index.containing("harry") == {2, 3}
+    with pytest.raises(ValueError):
+        index.search("harry", mode="regex")
+
+
+def test_get_movies_title_combined_with_filters(movies_data):
+    assert list(get_movies(
+        genres_ids=[2], title="t"
+    ).values_list("title", flat=True)) == ["Batman", "Titanic"]
+    assert list(get_movies(
+        actors_ids=[2], title="matrix 2"
+    ).values_list("title", flat=True)) == ["Matrix 2"]
+
+
+def test_movie_search_index_kept_in_sync(movies_data):
+    assert [movie.title for movie in search_movies("matrix")] == [
+        "Matrix", "Matrix 2"
+    ]
+    create_movie(movie_title="Matrix Reloaded",
+                 movie_description="Matrix 3 movie",
+                 genres_ids=[2])
+    Movie.objects.get(title="Matrix").delete()
+    assert [movie.title for movie in search_movies("matrix")] == [
+        "Matrix 2", "Matrix Reloaded"
+    ]
+    assert [
+        movie.title for movie in search_movies("matrix", genres_ids=[2])
+    ] == ["Matrix Reloaded"]
+    assert [
+        movie.title for movie in search_movies("harry pot", mode="prefix")
+    ] == ["Harry Potter 1", "Harry Potter 2", "Harry Potter 3"]
+    assert search_movies("batmn", mode="fuzzy", threshold=0.2)[0].title == (
+        "Batman"
+    )
+
+    Movie.objects.bulk_create([
+        Movie(title="The Matrix Resurrections", description="")
+    ])
+    assert [movie.title for movie in get_movies(title="resurrect")] == [
+        "The Matrix Resurrections"
+    ]
+    assert "The Matrix Resurrections" in [
+        movie.title for movie in search_movies("matrix")
+    ]
+
+    Movie.objects.filter(title="Matrix 2").update(title="Tenet")
+    assert [movie.title for movie in search_movies("tenet")] == ["Tenet"]
+    assert "Tenet" not in [movie.title for movie in search_movies("matr")]
+
+
+def test_get_movies_filter_modes_return_distinct_movies(
+        movies_data,
+        django_assert_num_queries
+):
+    assert list(get_movies(
+        genres_ids=[1, 2]
+    ).values_list("title", flat=True)) == [
+        "Matrix", "Matrix 2", "Batman", "Titanic"
+    ]
+    assert list(get_movies(
+        genres_ids=[1, 2], genres_mode="all"
+    ).values_list("title", flat=True)) == ["Titanic"]
+    assert list(get_movies(
+        genres_ids=[1], actors_ids=[1, 2], actors_mode="all"
+    ).values_list("title", flat=True)) == ["Matrix"]
+    assert list(get_movies(
+        actors_ids=[1, 2, 3]
+    ).values_list("title", flat=True)) == ["Matrix", "Matrix 2", "Batman"]
+    with django_assert_num_queries(3):
+        assert [
+            sorted(genre.name for genre in movie.genres.all())
+            for movie in get_movies(genres_ids=[1, 2])
+        ] == [["Action"], ["Action"], ["Drama"], ["Action", "Drama"]]
+    with pytest.raises(ValueError):
+        get_movies(genres_ids=[1], genres_mode="some")
+
+
+def test_iter_fixture_records_streams_in_small_chunks():
+    with open(settings.BASE_DIR + "/cinema_db_data.json") as fixture:
+        expected = json.load(fixture)
+    with open(settings.BASE_DIR + "/cinema_db_data.json") as fixture:
+        assert list(iter_fixture_records(fixture, chunk_size=7)) == expected
+    assert list(iter_fixture_records(io.StringIO(" [ ] "))) == []
+    with pytest.raises(ValueError):
+        list(iter_fixture_records(io.StringIO('[{"model": "db.genre"}')))
+
+
+def test_import_fixture_in_batches():
+    with open(settings.BASE_DIR + "/cinema_db_data.json") as fixture:
+        counts = import_fixture(fixture, batch_size=2)
+    assert counts["db.ticket"] == Ticket.objects.count() == 16
+    assert counts["db.movie.actors"] == 12
+    assert sorted(
+        Movie.objects.get(id=2).actors.values_list("id", flat=True)
+    ) == [2, 4, 5]
+    assert get_user_model().objects.get(
+        username="admin.user"
+    ).check_password("1qazcde3")
+    assert Genre.objects.create(name="Comedy").id == 8
+
+
+def test_import_fixture_remaps_primary_keys():
+    CinemaHall.objects.create(name="Existing", rows=1, seats_in_row=1)
+    Actor.objects.create(first_name="Existing", last_name="Actor")
+    importer = FixtureImporter(batch_size=3, preserve_pks=False)
+    with open(settings.BASE_DIR + "/cinema_db_data.json") as fixture:
+        for record in iter_fixture_records(fixture):
+            importer.add(record)
+    importer.finish()
+    assert "db.movie" in importer.id_maps
+    assert "db.ticket" not in importer.id_maps
+    movie_session = MovieSession.objects.order_by("id").first()
+    assert movie_session.cinema_hall.name == "Ricciotto Canudo"
+    assert sorted(
+        Movie.objects.get(title="Inception").actors.values_list(
+            "last_name", flat=True
+        )
+    ) == ["DiCaprio", "Gordon-Levitt", "Page"]
+
+
+def test_export_orders_jsonl_is_resumable(tickets_data):
+    first_page = io.StringIO()
+    cursor = export_orders(first_page, page_size=1, username="user1",
+                           end=datetime.datetime(2020, 11, 2))
+    exported = [
+        json.loads(line) for line in first_page.getvalue().splitlines()
+    ]
+    assert [order["id"] for order in exported] == [1]
+    assert exported[0]["tickets"][0] == {
+        "id": 1,
+        "row": 7,
+        "seat": 10,
+        "movie_session_id": 1,
+        "show_time": "2019-08-19T20:30:00",
+        "movie": "Matrix",
+        "cinema_hall": "Blue",
+    }
+    assert exported[0]["cursor"] == cursor
+
+    rest = io.StringIO()
+    last_cursor = export_orders(rest, page_size=1, cursor=cursor)
+    assert [
+        json.loads(line)["id"] for line in rest.getvalue().splitlines()
+    ] == [2, 3]
+    assert export_orders(io.StringIO(), cursor=last_cursor) == last_cursor
+
+
+def test_export_orders_csv(tickets_data):
+    output = io.StringIO()
+    export_orders(output, export_format="csv",
+                  start=datetime.datetime(2020, 11, 2))
+    rows = output.getvalue().splitlines()
+    assert rows[0].startswith("order_id,created_at,username,ticket_id")
+    assert rows[1:] == [
+        "2,2020-11-02T00:00:00,user1,3,9,5,2,2017-08-19T11:10:00,"
+        "Titanic,Cheap",
+        "2,2020-11-02T00:00:00,user1,4,9,6,2,2017-08-19T11:10:00,"
+        "Titanic,Cheap",
+        "3,2020-11-03T00:00:00,user2,,,,,,,",
+    ]
+    with pytest.raises(ValueError):
+        export_orders(output, export_format="xml")
+
+
+def test_order_history_keyset_pages_with_totals(
+        tickets_data,
+        django_assert_num_queries
+):
+    MovieSession.objects.filter(id=1).update(price=decimal.Decimal("7.50"))
+    MovieSession.objects.filter(id=2).update(price=decimal.Decimal("5.00"))
+    Order.objects.create(
+        id=4, user_id=1, created_at=datetime.datetime(2020, 11, 2)
+    )
+
+    with django_assert_num_queries(1):
+        first_page = get_order_history("user1", page_size=2,
+                                       with_totals=True)
+    assert [order.id for order in first_page["orders"]] == [4, 2]
+    assert [
+        (order.tickets_count, order.total) for order in first_page["orders"]
+    ] == [(0, 0), (2, decimal.Decimal("10.00"))]
+
+    second_page = get_order_history(
+        "user1", cursor=first_page["next_cursor"], page_size=2
+    )
+    assert [order.id for order in second_page["orders"]] == [1]
+    assert second_page["next_cursor"] is None
+    assert get_order_history("user2")["orders"][0].id == 3
+
+
+def test_create_order_updates_occupancy_counters(create_order_data):
+    CinemaHall.objects.update(rows=4, seats_in_row=6)
+    create_order(
+        tickets=[
+            {"row": row, "seat": seat, "movie_session": 1}
+            for row in range(1, 5) for seat in range(1, 6)
+        ],
+        username="user_1",
+    )
+    movie_session = MovieSession.objects.get(id=1)
+    assert (movie_session.sold_count, movie_session.is_sold_out) == (20, False)
+    assert movie_session.seats_left == 4
+
+    order = create_order(
+        tickets=[
+            {"row": row, "seat": 6, "movie_session": 1}
+            for row in range(1, 5)
+        ],
+        username="user_1",
+    )
+    movie_session.refresh_from_db()
+    assert (movie_session.sold_count, movie_session.is_sold_out) == (24, True)
+
+    order.delete()
+    movie_session.refresh_from_db()
+    assert (movie_session.sold_count, movie_session.is_sold_out) == (20, False)
+
+
+def test_deleting_an_order_adjusts_occupancy_once_per_session(
+        create_order_data,
+        django_assert_max_num_queries
+):
+    order = create_order(
+        tickets=[
+            {"row": 1, "seat": seat, "movie_session": 1}
+            for seat in range(1, 11)
+        ],
+        username="user_1",
+    )
+    with django_assert_max_num_queries(12):
+        order.delete()
+    assert MovieSession.objects.get(id=1).sold_count == 0
+
+
+def test_changing_hall_capacity_updates_sold_out_flag(create_order_data):
+    create_order(
+        tickets=[{"row": 1, "seat": seat, "movie_session": 1}
+                 for seat in range(1, 5)],
+        username="user_1",
+    )
+    cinema_hall = MovieSession.objects.get(id=1).cinema_hall
+    cinema_hall.rows, cinema_hall.seats_in_row = 1, 4
+    cinema_hall.save()
+    assert MovieSession.objects.get(id=1).is_sold_out
+
+    cinema_hall.rows = 2
+    cinema_hall.save()
+    assert not MovieSession.objects.get(id=1).is_sold_out
+
+
+def test_reconcile_occupancy_reports_and_fixes_drift(tickets_data):
+    assert reconcile_occupancy() == []
+    MovieSession.objects.filter(id=1).update(sold_count=5)
+
+    assert reconcile_occupancy(fix=False) == [{
+        "movie_session": 1, "sold_count": 5, "actual": 2, "is_sold_out": False
+    }]
+    assert len(reconcile_occupancy()) == 1
+    assert MovieSession.objects.get(id=1).sold_count == 2
+    assert reconcile_occupancy() == []
+
+
+def test_get_schedule_groups_sessions_by_day_and_hall(
+        movie_sessions_data,
+        django_assert_num_queries
+):
+    MovieSession.objects.filter(id=4).update(sold_count=5)
+    with django_assert_num_queries(1):
+        schedule = get_schedule("2021-4-3")
+        assert list(schedule) == [datetime.date(2021, 4, 3)]
+        halls = schedule[datetime.date(2021, 4, 3)]
+        assert [hall.name for hall in halls] == ["VIP", "Cheap"]
+        assert [
+            (str(movie_session), movie_session.seats_left)
+            for sessions in halls.values() for movie_session in sessions
+        ] == [
+            ("<The Good, the Bad and the Ugly 2021-04-03 13:50:00>", 24),
+            ("<Matrix 2021-04-03 16:30:00>", 400),
+        ]
+
+    schedule = get_schedule(
+        datetime.date(2017, 1, 1), "2021-4-3", movie_ids=[1]
+    )
+    assert list(schedule) == [
+        datetime.date(2019, 8, 19), datetime.date(2021, 4, 3)
+    ]
+    assert get_schedule("2021-4-3", cinema_hall_ids=[1]) == {}
+    assert get_movies_sessions("2021-4-3").count() == 2
+    with pytest.raises(ValueError):
+        get_schedule("2021-4-3", "2021-4-2")
+
+
+def test_movie_session_schedule_conflicts(movie_sessions_data):
+    Movie.objects.filter(id=1).update(duration=90)
+    with pytest.raises(ScheduleConflictError) as error:
+        create_movie_session("2019-8-19 21:30", 2, 1)
+    assert error.value.conflicts == [{
+        "index": 0,
+        "cinema_hall": 1,
+        "show_time": datetime.datetime(2019, 8, 19, 21, 30),
+        "conflicts_with": 1,
+    }]
+
+    movie_session = create_movie_session("2019-8-19 22:00", 2, 1)
+    with pytest.raises(ScheduleConflictError):
+        update_movie_session(movie_session.id, show_time="2019-8-19 21:59")
+    update_movie_session(1, show_time="2019-8-19 20:00")
+    update_movie_session(movie_session.id, show_time="2019-8-19 21:30")
+
+    delete_movie_session_by_id(1)
+    create_movie_session("2019-8-19 20:00", 1, 1)
+    MovieSession.objects.filter(id=4).delete()
+    create_movie_session("2021-4-3 17:00", 1, 3)
+
+    MovieSession.objects.bulk_create([
+        MovieSession(show_time="2021-4-5 10:00", cinema_hall_id=3, movie_id=2)
+    ])
+    with pytest.raises(ScheduleConflictError):
+        create_movie_session("2021-4-5 11:00", 1, 3)
+
+
+@pytest.mark.django_db(transaction=True)
+def test_concurrent_session_creates_do_not_double_book_a_hall():
+    hall_id = CinemaHall.objects.create(name="VIP", rows=4, seats_in_row=6).id
+    movie_id = Movie.objects.create(title="Matrix", description="").id
+    barrier = threading.Barrier(2)
+    outcomes = []
+
+    def create() -> None:
+        barrier.wait()
+        try:
+            create_movie_session("2030-1-1 10:00", movie_id, hall_id)
+            outcomes.append("created")
+        except ScheduleConflictError:
+            outcomes.append("conflict")
+        finally:
+            connection.close()
+
+    threads = [threading.Thread(target=create) for _ in range(2)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert sorted(outcomes) == ["conflict", "created"]
+
+
+def test_schedule_sessions_in_bulk(movie_sessions_data):
+    rules = [{
+        "movie": 2,
+        "cinema_halls": [1, 2],
+        "times": ["10:00", "13:00"],
+        "start_date": "2019-8-18",
+        "end_date": "2019-8-24",
+        "weekdays": [0, 1, 2, 3, 4],
+    }]
+    assert schedule_sessions(rules) == {
+        "created": 20, "skipped": 0, "conflicted": 0, "conflicts": []
+    }
+    assert MovieSession.objects.count() == 24
+    assert schedule_sessions(rules)["skipped"] == 20
+
+    evening = {**rules[0], "times": ["18:00", "20:15", "21:00"],
+               "weekdays": None}
+    report = schedule_sessions([evening])
+    assert (report["created"], report["conflicted"]) == (27, 15)
+    assert {
+        conflict.get("conflicts_with") for conflict in report["conflicts"]
+    } == {1, None}
+    with pytest.raises(ScheduleConflictError):
+        schedule_sessions([{**evening, "times": ["19:30"]}], "raise")
+    with pytest.raises(ValidationError):
+        schedule_sessions([{**evening, "cinema_halls": [1, 99]}])
+    assert MovieSession.objects.count() == 51
+
+
+@pytest.mark.django_db(transaction=True)
+def test_async_services_run_in_thread_pool(create_order_data):
+    movie_session_id = MovieSession.objects.get().id
+
+    async def scenario() -> tuple:
+        orders = await asyncio.gather(*(
+            acreate_order(
+                tickets=[{"row": row, "seat": 1, "movie_session": movie_session_id}],
+                username="user_1",
+            )
+            for row in range(1, 5)
+        ))
+        movies, taken_seats, user_orders = await asyncio.gather(
+            aget_movies(title="Speed"),
+            aget_taken_seats(movie_session_id),
+            aget_orders("user_1"),
+        )
+        cached_seats = await aget_taken_seats(movie_session_id)
+        return orders, movies, taken_seats, cached_seats, user_orders
+
+    orders, movies, taken_seats, cached_seats, user_orders = asyncio.run(
+        scenario()
+    )
+    assert len({order.id for order in orders}) == 4
+    assert [movie.title for movie in movies] == ["Speed"]
+    assert taken_seats == cached_seats == [
+        {"row": row, "seat": 1} for row in range(1, 5)
+    ]
+    assert sorted(
+        ticket.row for order in user_orders for ticket in order.tickets.all()
+    ) == [1, 2, 3, 4]
+
+
+def test_provision_users_in_bulk(django_assert_max_num_queries):
+    pbkdf2_hash = make_password("legacy", hasher="pbkdf2_sha256")
+    users = [
+        {"username": f"member{index}", "password": f"secret{index}"}
+        for index in range(5)
+    ] + [{"username": "legacy", "password_hash": pbkdf2_hash}]
+
+    with django_assert_max_num_queries(5):
+        assert provision_users(users, processes=1, batch_size=4) == 6
+    assert provision_users(
+        [
+            {"username": f"pooled{index}", "password": "pooled",
+             "email": "A@X.COM"}
+            for index in range(3)
+        ],
+        processes=2,
+    ) == 3
+
+    members = get_user_model().objects.in_bulk(field_name="username")
+    assert members["member3"].check_password("secret3")
+    assert members["member3"].password.startswith(
+        f"pbkdf2_sha256${FastPBKDF2PasswordHasher.iterations}$"
+    )
+    assert members["legacy"].check_password("legacy")
+    assert members["pooled2"].check_password("pooled")
+    assert members["pooled2"].email == "A@x.com"
+    with pytest.raises(ValidationError):
+        provision_users([{"username": "broken", "password_hash": "nope"}])
+
+    update_user(members["member0"].id, password_hash=pbkdf2_hash)
+    assert get_user_model().objects.get(
+        username="member0"
+    ).check_password("legacy")
+
+
+def test_provision_users_hashes_small_inputs_in_process():
+    users = [{"username": "member", "password": "secret"}]
+    assert hashing_pool(users) is None
+    assert hashing_pool(users, processes=1) is None
+    assert hashing_pool(
+        users * POOL_HASHING_THRESHOLD, processes=1
+    ) is None
+
+
+def test_update_user_password_runs_password_changed_hooks(
+        users_data,
+        monkeypatch
+):
+    changed = []
+    monkeypatch.setattr(
+        "django.contrib.auth.password_validation.password_changed",
+        lambda password, user=None, **kwargs: changed.append(password),
+    )
+    update_user(1, password="new_password1234")
+    assert changed == ["new_password1234"]
+    assert get_user(1).check_password("new_password1234")
+
+
+def test_partial_updates_write_only_supplied_fields(
+        movie_sessions_data,
+        users_data,
+        django_assert_num_queries
+):
+    with django_assert_num_queries(1) as context:
+        assert update_user(1, email="new@example.com") is True
+    assert "username" not in context.captured_queries[0]["sql"]
+    with django_assert_num_queries(1):
+        assert update_user(99, email="new@example.com") is False
+    assert update_user(2) is True
+    assert get_user(1).email == "new@example.com"
+
+    assert update_movie_session(99, show_time="2019-8-20 10:00") is False
+    assert update_movie_session(3, show_time="2021-4-3 14:00") is True
+    movie_session = MovieSession.objects.get(id=3)
+    assert movie_session.show_time == datetime.datetime(2021, 4, 3, 14)
+    assert movie_session.cinema_hall_id == 2
+
+
+def test_catalog_cache_serves_and_invalidates_lookups(
+        movies_data,
+        cinema_halls_data,
+        django_assert_num_queries
+):
+    with django_assert_num_queries(3):
+        movie = get_movie_by_id(1)
+        movie.title = "Changed"
+        movie.genres.all()[0].name = "Changed"
+        cached = get_movie_by_id(1)
+        assert cached == movie and cached is not movie
+        assert cached.title == "Matrix"
+        assert [genre.name for genre in cached.genres.all()] == ["Action"]
+    with django_assert_num_queries(1):
+        assert len(get_cinema_halls()) == len(get_cinema_halls()) == 3
+
+    movie.genres.add(2)
+    assert len(get_movie_by_id(1).genres.all()) == 2
+    Genre.objects.filter(id=2).get().delete()
+    assert len(get_movie_by_id(1).genres.all()) == 1
+    create_cinema_hall("Red", 5, 5)
+    assert len(get_cinema_halls()) == 4
+    assert catalog_cache.stats()["hits"] == 2
+
+    catalog_cache.clear()
+    assert warm_up_catalog_cache(batch_size=2) == 9
+    with django_assert_num_queries(0):
+        get_movie_by_id(7)
+        get_cinema_halls()
+    assert catalog_cache.stats()["hit_rate"] == 1.0
+
+    shared_cache = create_catalog_cache({"BACKEND": "django"})
+    assert isinstance(shared_cache.backend, DjangoCacheBackend)
+    with django_assert_num_queries(1):
+        assert shared_cache.get_or_load(
+            "movie:2", lambda: Movie.objects.get(id=2)
+        ).title == "Matrix 2"
+        assert shared_cache.get_or_load("movie:2", list).title == "Matrix 2"
+    shared_cache.clear()
+    assert shared_cache.get_or_load("movie:2", list) == []
+
+
+@pytest.fixture()
+def replica_databases(tmp_path, settings):
+    aliases = ["replica_a", "replica_b"]
+    for alias in aliases:
+        connections.settings[alias] = connections.configure_settings({
+            "default": connections.settings["default"],
+            alias: {
+                "ENGINE": "django.db.backends.sqlite3",
+                "NAME": str(tmp_path / f"{alias}.sqlite3"),
+            },
+        })[alias]
+        call_command("migrate", database=alias, verbosity=0)
+        Movie.objects.using(alias).create(title=alias, description="")
+    settings.REPLICA_READ_AFTER_WRITE_SECONDS = 0
+    configure_replicas(dict.fromkeys(aliases, 1))
+    yield aliases
+    configure_replicas({})
+    for alias in aliases:
+        connections[alias].close()
+        del connections[alias]
+        del connections.settings[alias]
+
+
+def test_replica_selector_spreads_reads_by_weight():
+    selector = ReplicaSelector({"a": 3, "b": 1, "c": 0})
+    assert [selector.next() for _ in range(8)] == [
+        "a", "a", "b", "a", "a", "a", "b", "a"
+    ]
+    assert not ReplicaSelector({})
+
+
+@pytest.mark.django_db(transaction=True, databases="__all__")
+def test_read_replica_routing(replica_databases, settings):
+    Movie.objects.create(title="primary", description="")
+
+    titles = [
+        [movie.title for movie in get_movies()] for _ in range(4)
+    ]
+    assert titles == [["replica_a"], ["replica_b"]] * 2
+    assert [movie.title for movie in Movie.objects.all()] == ["primary"]
+
+    movie_session = MovieSession.objects.create(
+        show_time="2030-1-1 10:00",
+        cinema_hall=CinemaHall.objects.create(name="Blue", rows=2,
+                                              seats_in_row=2),
+        movie=Movie.objects.get(),
+    )
+    assert get_taken_seats(movie_session.id) == []
+    assert get_taken_seats(movie_session.id) == []
+    assert seat_map_cache.stats()["hits"] == 1
+
+    with transaction.atomic():
+        assert [movie.title for movie in get_movies()] == ["primary"]
+
+    settings.REPLICA_READ_AFTER_WRITE_SECONDS = 60
+    Movie.objects.create(title="fresh", description="")
+    assert [movie.title for movie in get_movies()] == ["primary", "fresh"]
+
+
+def test_concurrent_sqlite_profile_tunes_connections(tmp_path, settings):
+    profile = settings.SQLITE_PROFILES["concurrent"]
+    settings.SQLITE_PRAGMAS = profile["PRAGMAS"]
+    connections.settings["tuned"] = connections.configure_settings({
+        "default": connections.settings["default"],
+        "tuned": {
+            "ENGINE": "db.backends.sqlite3",
+            "NAME": str(tmp_path / "tuned.sqlite3"),
+            "OPTIONS": profile["OPTIONS"],
+        },
+    })["tuned"]
+    tuned = connections["tuned"]
+    try:
+        assert isinstance(tuned, DatabaseWrapper)
+        with tuned.cursor() as cursor:
+            pragmas = {
+                name: cursor.execute(f"PRAGMA {name}").fetchone()[0]
+                for name in ("journal_mode", "synchronous", "busy_timeout")
+            }
+        assert pragmas == {
+            "journal_mode": "wal", "synchronous": 1, "busy_timeout": 5000
+        }
+        tuned.force_debug_cursor = True
+        with transaction.atomic(using="tuned"):
+            assert tuned.queries_log[-1]["sql"] == "BEGIN IMMEDIATE"
+    finally:
+        tuned.close()
+        del connections["tuned"]
+        del connections.settings["tuned"]
+
+
+def test_sales_rollup_tracks_orders_and_answers_analytics(
+        tickets_data,
+        django_assert_max_num_queries
+):
+    MovieSession.objects.filter(id=4).update(price=decimal.Decimal("7.50"))
+    order = create_order(
+        tickets=[{"row": 1, "seat": seat, "movie_session": 4}
+                 for seat in range(1, 4)],
+        username="user1",
+    )
+    create_order(
+        tickets=[{"row": 1, "seat": 1, "movie_session": 3}],
+        username="user2",
+    )
+
+    with django_assert_max_num_queries(1):
+        top_movies = get_top_movies("2021-04-03", order_by="revenue")
+    assert [
+        (movie["movie"], movie["tickets"], movie["revenue"])
+        for movie in top_movies
+    ] == [(1, 3, decimal.Decimal("22.50")), (5, 1, 0)]
+    utilization = get_hall_utilization("2021-04-03")
+    assert [
+        (hall["cinema_hall"], hall["sessions"], hall["tickets"])
+        for hall in utilization
+    ] == [(1, 0, 0), (2, 1, 1), (3, 1, 3)]
+    assert utilization[2]["utilization"] == 3 / 405
+
+    def tickets_per_day() -> list[int]:
+        return [
+            day["tickets"]
+            for day in get_sales_time_series("2021-04-02", "2021-04-04")
+        ]
+
+    assert tickets_per_day() == [0, 4, 0]
+    update_movie_session(4, show_time="2021-04-04 16:30")
+    assert tickets_per_day() == [0, 1, 3]
+    order.delete()
+    assert tickets_per_day() == [0, 1, 0]
+
+    def snapshot() -> set:
+        return set(SalesRollup.objects.filter(tickets_sold__gt=0).values_list(
+            "date", "movie_id", "cinema_hall_id", "tickets_sold", "revenue"
+        ))
+
+    incremental = snapshot()
+    assert rebuild_sales_rollup() == 3
+    assert snapshot() == incremental
+    assert rebuild_sales_rollup("2021-04-03") == 1
+    assert snapshot() == incremental
+
+
+def test_saving_a_session_moves_sales_only_when_its_key_changes(
+        tickets_data,
+        django_assert_num_queries
+):
+    create_order(
+        tickets=[{"row": 1, "seat": seat, "movie_session": 4}
+                 for seat in range(1, 3)],
+        username="user1",
+    )
+    movie_session = MovieSession.objects.get(id=4)
+    with django_assert_num_queries(2):
+        movie_session.save()
+
+    movie_session.price = decimal.Decimal("5.00")
+    movie_session.save()
+    assert SalesRollup.objects.filter(
+        movie_id=movie_session.movie_id,
+        cinema_hall_id=movie_session.cinema_hall_id,
+    ).values_list("tickets_sold", "revenue").get() == (
+        2, decimal.Decimal("10.00")
+    )